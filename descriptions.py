@@ -12,16 +12,33 @@ description.py — NamuWiki drama table scraper (section-locked + fallback)
 """
 
 import re
+import csv
 import time
 from pathlib import Path
 from urllib.parse import quote
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup, Tag
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from html_text import get_text
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
+try:
+    import pyarrow  # noqa: F401  (Parquet 저장 엔진)
+except ImportError:  # pyarrow 미설치 시 Parquet 사본 없이 CSV만 저장
+    pyarrow = None
 
 IN_CSV  = Path("kdrama_2025_fin.csv")
 OUT_CSV = Path("description.csv")
+TITLE_COLS = ("title", "제목")
 
 BASE = "https://namu.wiki"
 HEADERS = {
@@ -32,29 +49,64 @@ HEADERS = {
 }
 TIMEOUT = 8
 SLEEP   = 0.35
-
-COMMON_SELECTOR_PRIMARY = (
-    "div.BpaiDiJp.M4Ezwymi > div:nth-child(5) div.kZb-CLkK._1BEih8Vh > table, "
-    "div.BpaiDiJp.M4Ezwymi > div:nth-child(6) div.kZb-CLkK._1BEih8Vh > table, "
-    "div.BpaiDiJp.M4Ezwymi > div:nth-child(7) div.kZb-CLkK._1BEih8Vh > table, "
-    "div.BpaiDiJp.M4Ezwymi > div:nth-child(8) div.kZb-CLkK._1BEih8Vh > table"
+WORKERS = 8
+WRITE_BUF = 1024 * 1024  # CSV 쓰기 버퍼(1MB)
+CACHE_PATH = "namu_cache.sqlite"
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
+
+def _has_class(*names: str) -> str:
+    """CSS '.a.b'와 같은 의미의 XPath 조건식"""
+    return " and ".join(f"contains(concat(' ', normalize-space(@class), ' '), ' {n} ')" for n in names)
+
+# 1차: div.BpaiDiJp.M4Ezwymi > div:nth-child(5~8) div.kZb-CLkK._1BEih8Vh > table
+#      섹션별로 따로 두고 앞 섹션부터 조회 → 표가 나오면 나머지 섹션은 건너뜀
+#      (XPath는 모듈 로드 시 한 번만 컴파일)
+COMMON_XPATH_SECTIONS = tuple(
+    etree.XPath(
+        f"//div[{_has_class('BpaiDiJp', 'M4Ezwymi')}]/*[{n}][self::div]"
+        f"//div[{_has_class('kZb-CLkK', '_1BEih8Vh')}]/table"
+    )
+    for n in (5, 6, 7, 8)
 )
 
-
 # 폴백: article 전역 테이블
-COMMON_SELECTOR_FALLBACK = "article table"
-
+COMMON_XPATH_FALLBACK = etree.XPath("//article//table")
+
+CELLS_XPATH = etree.XPath(".//th|.//td")
+
+# ---- 정규식 ----
+DRAMA_SUFFIX_RE = re.compile(r"\s*\(드라마\)\s*$")
+MULTISPACE_RE   = re.compile(r"\s+")
+FOOTNOTE_RE     = re.compile(r"\[[^\]]*\]")
+DBLSPACE_RE     = re.compile(r"\s{2,}")
+
+# ---- 세션/요청 ----
+def make_session() -> requests.Session:
+    # 재실행 시 같은 문서는 로컬 SQLite 캐시에서 읽음 (GET/HEAD, 하루 유지)
+    if CachedSession is not None:
+        s = CachedSession(CACHE_PATH, expire_after=CACHE_TTL, allowable_methods=("GET", "HEAD"))
+    else:
+        s = requests.Session()
+    s.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=0.3)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=WORKERS)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+    return s
+
+SESSION = make_session()
+
+@lru_cache(maxsize=4096)
 def norm_title(s: str) -> str:
     if not s:
         return ""
     t = str(s).strip()
-    t = re.sub(r"\s*\(드라마\)\s*$", "", t)
-    t = re.sub(r"\s+", " ", t).strip(" .")
+    t = DRAMA_SUFFIX_RE.sub("", t)
+    t = MULTISPACE_RE.sub(" ", t).strip(" .")
     return t
 
 def get_html(url: str) -> str | None:
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        r = SESSION.get(url, timeout=TIMEOUT)
         if r.status_code != 200:
             print(f"[http] {r.status_code}: {url}")
             return None
@@ -69,90 +121,121 @@ def open_w(title_text: str) -> str | None:
     print(f"[open] {title_text} -> {'OK' if html else 'FAIL'} {url}")
     return html
 
-def table_to_text_one_line(tbl: Tag) -> str:
-    cells = tbl.select("th, td")
+def table_to_text_one_line(cells: list[HtmlElement]) -> str:
     if not cells:
         return ""
-    text = " ".join(c.get_text(" ", strip=True) for c in cells)
+    # 보이는 텍스트 노드(style/script 제외)를 공백으로 이어 붙이고, 공백 정리는 아래 정규식 한 번으로 처리
+    text = " ".join(get_text(c, " ") for c in cells)
     # 각주 제거
-    text = re.sub(r"\[[^\]]*\]", "", text)
+    text = FOOTNOTE_RE.sub("", text)
     text = text.replace("\n", " ").replace("\r", " ").replace("\t", " ")
-    text = re.sub(r"\s{2,}", " ", text).strip()
+    text = DBLSPACE_RE.sub(" ", text).strip()
     return text
 
-def pick_best_table(tables: list[Tag]) -> Tag | None:
+def with_cells(tables: list[HtmlElement]) -> list[tuple[HtmlElement, list[HtmlElement]]]:
+    """(table, th/td 목록) 쌍으로 한 번만 수집, 셀 없는 표는 제외"""
+    pairs = [(t, CELLS_XPATH(t)) for t in tables]
+    return [(t, cells) for t, cells in pairs if cells]
+
+def pick_best_table(tables: list[tuple[HtmlElement, list[HtmlElement]]]) -> tuple[HtmlElement, list[HtmlElement]] | None:
     if not tables:
         return None
-    return max(tables, key=lambda t: len(t.select("th, td")))
+    return max(tables, key=lambda tc: len(tc[1]))
 
 def extract_by_common_selector(html: str) -> str:
-    soup = BeautifulSoup(html, "html.parser")
-
-    # 1차: 섹션 5~10 범위 내 테이블 (직계 + 래퍼 내부)
-    primary = soup.select(COMMON_SELECTOR_PRIMARY)
-    primary = [t for t in primary if len(t.select("th, td")) > 0]
+    doc = lxml.html.fromstring(html)
 
-    candidates = primary
+    # 1차: 섹션 5~8 순서대로, 셀 있는 표가 처음 나온 섹션에서 멈춤
+    candidates = []
+    for xp in COMMON_XPATH_SECTIONS:
+        candidates = with_cells(xp(doc))
+        if candidates:
+            break
 
     # 1차에서 못 찾으면 폴백(article 전역)
     if not candidates:
-        fallback = soup.select(COMMON_SELECTOR_FALLBACK)
-        fallback = [t for t in fallback if len(t.select("th, td")) > 0]
-        candidates = fallback
+        candidates = with_cells(COMMON_XPATH_FALLBACK(doc))
 
     if not candidates:
         return ""
 
     best = pick_best_table(candidates)
-    return table_to_text_one_line(best) if best else ""
+    return table_to_text_one_line(best[1]) if best else ""
+
+@lru_cache(maxsize=1024)
+def page_description(title_text: str) -> str | None:
+    """문서 열기 + 표 추출 결과를 문서명별로 캐시 (None = 문서 없음, HTML 본문은 보관하지 않음)"""
+    html = open_w(title_text)
+    return extract_by_common_selector(html) if html else None
 
 def process_one_title(title: str) -> str:
     base = norm_title(title)
 
     for dv in (f"{base} (드라마)", f"{base}(드라마)"):
-        html = open_w(dv)
-        if html:
-            txt = extract_by_common_selector(html)
+        txt = page_description(dv)
+        if txt is not None:
             if txt:
                 print(f"[OK] matched on drama-variant: {dv}")
                 return txt
             else:
                 print(f"[miss] no match on drama-variant: {dv}")
 
-    html = open_w(base)
-    if html:
-        txt = extract_by_common_selector(html)
+    txt = page_description(base)
+    if txt is not None:
         if txt:
-            print("[OK] matched on base page")
+            print(f"[OK] matched on base page: {base}")
             return txt
         else:
-            print("[miss] no match on base page")
+            print(f"[miss] no match on base page: {base}")
 
-    print("[FAIL] no table matched")
+    print(f"[FAIL] no table matched: {base}")
     return ""
 
+def describe_title(title: str) -> dict:
+    """워커 단위: 제목 1개 처리 후 SLEEP만큼 쉬어 동시 요청 속도를 제한"""
+    desc = process_one_title(title)
+    time.sleep(SLEEP)
+    return {"title": title, "description": desc}
+
+def write_parquet_sidecar(csv_path: Path) -> None:
+    """다음 단계에서 빠르게 읽도록 CSV 옆에 Parquet 사본 저장 (pyarrow 없으면 CSV만 유지)"""
+    if pyarrow is None:  # 엔진이 없으면 CSV를 다시 읽기 전에 바로 생략
+        print("[skip] parquet 저장 생략: pyarrow 미설치")
+        return
+    out = csv_path.with_suffix(".parquet")
+    # 방금 쓴 CSV를 그대로 옮김 (모든 열은 문자열, 빈 칸도 결측 대신 빈 문자열)
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df.to_parquet(out, index=False, engine="pyarrow", compression="zstd")
+    print(f"[✓] parquet 저장: {out}")
+
 def main():
     if not IN_CSV.exists():
         raise SystemExit("kdrama_2025.csv 파일이 없습니다.")
-    df = pd.read_csv(IN_CSV, encoding="utf-8")
-    title_col = next((c for c in ("title", "제목") if c in df.columns), None)
+    # 제목 컬럼만 읽음 (나머지 컬럼은 파싱/할당하지 않음)
+    df = pd.read_csv(IN_CSV, encoding="utf-8", usecols=lambda c: c in TITLE_COLS, dtype=str)
+    title_col = next((c for c in TITLE_COLS if c in df.columns), None)
     if not title_col:
         raise SystemExit("CSV에 'title' 또는 '제목' 컬럼이 없습니다.")
 
-    rows = []
-    titles = [str(x).strip() for x in df[title_col].fillna("") if str(x).strip()]
-    for i, t in enumerate(titles, 1):
-        print(f"\n[{i}/{len(titles)}] {t}")
-        desc = process_one_title(t)
-        rows.append({"title": t, "description": desc})
-        time.sleep(SLEEP)
-
-    out_df = pd.DataFrame(rows, columns=["title", "description"])
-    out_df = out_df.drop_duplicates(subset=["title"], keep="last")
-    out_df.to_csv(OUT_CSV, index=False, encoding="utf-8-sig")
-
-    filled = (out_df["description"].astype(str).str.len() > 0).sum()
-    print(f"\n[✓] 저장 완료: {OUT_CSV} (총 {len(out_df)}행, 채움 {filled}개, 비어있음 {len(out_df)-filled}개)")
+    col = df[title_col].astype("string").str.strip()  # 행 단위 str() 변환 없이 한 번에 정리
+    titles = col[col.str.len() > 0].tolist()
+    titles = list(dict.fromkeys(titles))  # 중복 제목은 한 번만 요청
+
+    # 결과는 메모리에 모으지 않고 나오는 즉시 CSV에 기록 (1MB 블록 버퍼)
+    total = filled = 0
+    with open(OUT_CSV, "w", newline="", encoding="utf-8-sig", buffering=WRITE_BUF) as f:
+        w = csv.DictWriter(f, fieldnames=["title", "description"])
+        w.writeheader()
+        # 제목별 요청은 서로 독립 → WORKERS개 스레드로 네트워크 대기를 겹침 (결과 순서는 입력 순서 유지)
+        with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+            for i, row in enumerate(ex.map(describe_title, titles), 1):
+                print(f"\n[{i}/{len(titles)}] {row['title']} -> {'OK' if row['description'] else 'EMPTY'}")
+                w.writerow(row)
+                total += 1
+                filled += bool(row["description"])
+
+    print(f"\n[✓] 저장 완료: {OUT_CSV} (총 {total}행, 채움 {filled}개, 비어있음 {total-filled}개)")
+    write_parquet_sidecar(OUT_CSV)
 
 if __name__ == "__main__":
     main()
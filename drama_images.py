@@ -1,13 +1,27 @@
 # -*- coding: utf-8 -*-
-import os, re
+import os, re, csv, time, shutil
 from pathlib import Path
 from urllib.parse import quote, urljoin, urlparse
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 import requests, pandas as pd
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import HTTPError as Urllib3HTTPError
+from urllib3.util.retry import Retry
+from og_image import og_image_content
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
+try:
+    import pyarrow  # noqa: F401  (Parquet 저장 엔진)
+except ImportError:  # pyarrow 미설치 시 Parquet 사본 없이 CSV만 저장
+    pyarrow = None
 
 CSV_PATH  = Path("kdrama_2025.csv")
 OUT_DIR   = Path("namu_images")
 FINAL_CSV = Path("drama_image.csv")
+TITLE_COLS = ("title", "제목")
 
 BASE = "https://namu.wiki"
 HEADERS = {
@@ -17,8 +31,36 @@ HEADERS = {
     "Accept-Language": "ko,ko-KR;q=0.9,en;q=0.8",
 }
 TIMEOUT = 4
+COPY_BUF = 1024 * 1024  # 이미지 저장 버퍼(1MB)
+SLEEP   = 0.35
+WORKERS = 8
+CACHE_PATH = "namu_cache.sqlite"
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
 ALLOWED_PREFIXES = ("/", "/w/", "/img/", "/i/", "/js/", "/css/", "/_nuxt/")
 
+DRAMA_SUFFIX_RE = re.compile(r"\s*\(드라마\)\s*$")
+QUOTE_RE        = re.compile(r"[《》〈〉“”‘’\"'`]+")
+MULTISPACE_RE   = re.compile(r"\s+")
+SANITIZE_RE     = re.compile(r'[\\/:*?"<>|]+')
+SVG_ICO_RE      = re.compile(r"\.(svg|ico)(?:$|\?)", re.I)
+BAD_NAME_RE     = re.compile(r"(logo|favicon|sprite|icon)", re.I)
+
+def make_session(use_cache: bool = True) -> requests.Session:
+    # 재실행 시 같은 문서는 로컬 SQLite 캐시에서 읽음 (GET/HEAD, 하루 유지)
+    if use_cache and CachedSession is not None:
+        s = CachedSession(CACHE_PATH, expire_after=CACHE_TTL, allowable_methods=("GET", "HEAD"))
+    else:
+        s = requests.Session()
+    s.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=0.3)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=WORKERS)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+    return s
+
+SESSION = make_session()
+# 이미지 본문은 캐시에 넣지 않음: 캐시 DB가 이미지로 불어나지 않고, r.raw 스트리밍도 항상 실제 응답에서 읽음
+IMG_SESSION = make_session(use_cache=False)
+
 def allowed(url: str) -> bool:
     p = urlparse(url); return any(p.path.startswith(pref) for pref in ALLOWED_PREFIXES)
 
@@ -31,62 +73,72 @@ def nurl(src: str, base: str = BASE) -> str:
     return urljoin(base, s)
 
 def sanitize(name: str) -> str:
-    return re.sub(r'[\\/:*?"<>|]+', "_", str(name)).strip() or "untitled"
+    return SANITIZE_RE.sub("_", str(name)).strip() or "untitled"
 
+@lru_cache(maxsize=4096)
 def norm_title(s: str) -> str:
     if not s: return ""
     t = str(s).strip()
-    t = re.sub(r"\s*\(드라마\)\s*$", "", t)
-    t = re.sub(r"[《》〈〉“”‘’\"'`]+", "", t)
-    t = re.sub(r"\s+", " ", t).strip(" .")
+    t = DRAMA_SUFFIX_RE.sub("", t)
+    t = QUOTE_RE.sub("", t)
+    t = MULTISPACE_RE.sub(" ", t).strip(" .")
     return t
 
 def get_html(url: str):
     if not allowed(url): return None, "disallowed_path"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        r = SESSION.get(url, timeout=TIMEOUT)
         if r.status_code != 200: return None, f"http_{r.status_code}"
         return r.text, ""
     except requests.RequestException as e:
         return None, type(e).__name__
 
 def extract_og_image(html: str) -> str | None:
-    soup = BeautifulSoup(html, "html.parser")
-    tag = soup.find("meta", attrs={"property": "og:image"})
-    if not tag: return None
-    val = (tag.get("content") or "").strip()
+    val = (og_image_content(html) or "").strip()
     if not val or val.startswith("data:"): return None
-    if re.search(r"\.(svg|ico)(?:$|\?)", val, re.I): return None
-    if re.search(r"(logo|favicon|sprite|icon)", val, re.I): return None
+    if SVG_ICO_RE.search(val): return None
+    if BAD_NAME_RE.search(val): return None
     return nurl(val)
 
+def head_missing(url: str) -> str:
+    """HEAD로 문서 존재만 확인. 확실히 없으면(404/410) 사유 반환, 그 외엔 "" → GET 진행"""
+    try:
+        r = SESSION.head(url, timeout=TIMEOUT, allow_redirects=True)
+    except requests.RequestException:
+        return ""
+    return f"http_{r.status_code}" if r.status_code in (404, 410) else ""
+
 def open_w_exact(title_text: str):
     url = f"{BASE}/w/{quote(title_text, safe='')}"
+    missing = head_missing(url)  # 없는 후보 문서는 본문 GET/파싱 생략
+    if missing: return None, url, f"open_failed:{missing}"
     html, err = get_html(url)
     if html is None: return None, url, f"open_failed:{err}"
     return html, url, "OK"
 
+@lru_cache(maxsize=1024)
+def page_og_image(title_text: str):
+    """문서 열기 + og:image 추출 결과를 문서명별로 캐시 → (page_url, img_url|None), HTML 본문은 보관하지 않음"""
+    html, page_url, _ = open_w_exact(title_text)
+    return page_url, (extract_og_image(html) if html is not None else None)
+
 def download_image(url: str, out_path: Path, referer: str) -> bool:
     if not allowed(url): return False
-    headers = dict(HEADERS); headers["Referer"] = referer
     try:
-        with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+        with IMG_SESSION.get(url, headers={"Referer": referer}, stream=True, timeout=TIMEOUT) as r:
             if r.status_code != 200: return False
-            out_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(out_path, "wb") as f:
-                for chunk in r.iter_content(16384):
-                    if chunk: f.write(chunk)
+            r.raw.decode_content = True  # gzip 등 전송 인코딩은 풀어서 저장
+            with open(out_path, "wb", buffering=0) as f:
+                shutil.copyfileobj(r.raw, f, length=COPY_BUF)
         return True
-    except requests.RequestException:
+    except (requests.RequestException, Urllib3HTTPError):  # r.raw 읽기 오류는 urllib3 예외로 올라옴
         return False
 
 def find_and_download(title_display: str):
     """(드라마) → (드라마)무공백 → 기본 순서로 og:image 찾고 다운로드."""
     base = norm_title(title_display)
     for cand in (f"{base} (드라마)", f"{base}(드라마)", base):
-        html, page_url, _ = open_w_exact(cand)
-        if html is None: continue
-        img_url = extract_og_image(html)
+        page_url, img_url = page_og_image(cand)
         if not img_url: continue
         ext = os.path.splitext(img_url.split("?")[0].split("#")[0])[-1] or ".jpg"
         outp = OUT_DIR / f"{sanitize(title_display)}{ext}"
@@ -94,37 +146,62 @@ def find_and_download(title_display: str):
             return img_url
     return None  # 실패 시 None
 
+def fetch_image(title_display: str):
+    """워커 단위: 제목 1개 처리 후 SLEEP만큼 쉬어 동시 요청 속도를 제한"""
+    img_url = find_and_download(title_display)
+    time.sleep(SLEEP)
+    return img_url
+
+def write_parquet_sidecar(csv_path: Path) -> None:
+    """다음 단계에서 빠르게 읽도록 CSV 옆에 Parquet 사본 저장 (pyarrow 없으면 CSV만 유지)"""
+    if pyarrow is None:  # 엔진이 없으면 CSV를 다시 읽기 전에 바로 생략
+        print("[skip] parquet 저장 생략: pyarrow 미설치")
+        return
+    out = csv_path.with_suffix(".parquet")
+    # 방금 쓴 CSV를 그대로 옮김 (모든 열은 문자열, 빈 칸도 결측 대신 빈 문자열)
+    df = pd.read_csv(csv_path, encoding="utf-8-sig", dtype=str, keep_default_na=False)
+    df.to_parquet(out, index=False, engine="pyarrow", compression="zstd")
+    print(f"[✓] parquet 저장: {out}")
+
 def main():
-    OUT_DIR.mkdir(parents=True, exist_ok=True)
-    df = pd.read_csv(CSV_PATH, encoding="utf-8")
-    title_col = next((c for c in ("title","제목") if c in df.columns), None)
+    OUT_DIR.mkdir(parents=True, exist_ok=True)  # 저장 폴더는 여기서 한 번만 생성 (download_image에서는 생략)
+    # 제목 컬럼만 읽음 (나머지 컬럼은 파싱/할당하지 않음)
+    df = pd.read_csv(CSV_PATH, encoding="utf-8", usecols=lambda c: c in TITLE_COLS, dtype=str)
+    title_col = next((c for c in TITLE_COLS if c in df.columns), None)
     if not title_col: raise SystemExit("CSV에 'title' 또는 '제목' 컬럼이 없습니다.")
-    titles = [str(x).strip() for x in df[title_col].fillna("") if str(x).strip()]
+    col = df[title_col].astype("string").str.strip()  # 행 단위 str() 변환 없이 한 번에 정리
+    titles = col[col.str.len() > 0].tolist()
+    titles = list(dict.fromkeys(titles))  # 중복 제목은 한 번만 요청
 
     out_rows = []
-    for i, t in enumerate(titles, 1):
-        print(f"[{i}/{len(titles)}] {t} ...", end="")
-        img_url = find_and_download(t)
-        if img_url:
-            print(" OK")
-            url_value = img_url
-        else:
-            print(" (no image)")
-            url_value = ""  # 못가져오면 비워둠
-
-        out_rows.append({
-            "title": t,
-            "type": "drama_image",
-            "url": url_value,
-            "sort_no": 1
-        })
-
-    pd.DataFrame(out_rows, columns=["title","type","url","sort_no"]) \
-      .to_csv(FINAL_CSV, index=False, encoding="utf-8-sig")
+    # 제목별 탐색/다운로드는 독립 → 스레드로 병렬 처리 (결과 순서는 입력 순서 유지)
+    with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+        results = ex.map(fetch_image, titles)
+        for i, (t, img_url) in enumerate(zip(titles, results), 1):
+            print(f"[{i}/{len(titles)}] {t} ...", end="")
+            if img_url:
+                print(" OK")
+                url_value = img_url
+            else:
+                print(" (no image)")
+                url_value = ""  # 못가져오면 비워둠
+
+            out_rows.append({
+                "title": t,
+                "type": "drama_image",
+                "url": url_value,
+                "sort_no": 1
+            })
+
+    with open(FINAL_CSV, "w", newline="", encoding="utf-8-sig") as f:
+        w = csv.DictWriter(f, fieldnames=["title","type","url","sort_no"])
+        w.writeheader()
+        w.writerows(out_rows)
 
     ok_cnt = sum(1 for r in out_rows if r["url"])
     print(f"\n저장 완료: {FINAL_CSV} (총 {len(out_rows)}개, 성공 {ok_cnt}개, 실패 {len(out_rows)-ok_cnt}개)")
     print(f"이미지 폴더: {OUT_DIR}")
+    write_parquet_sidecar(FINAL_CSV)
 
 if __name__ == "__main__":
     main()
@@ -11,17 +11,27 @@ drama_person.py — 위키 목록 → 상세(기본) 또는 단일 상세(--url)
 """
 
 import re
+import csv
 import time
 import argparse
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Optional, Tuple
+from functools import lru_cache
 from urllib.parse import urljoin
 from concurrent.futures import ThreadPoolExecutor, as_completed
 
-import pandas as pd
 import requests
-from bs4 import BeautifulSoup, Tag
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+from bs4 import BeautifulSoup, SoupStrainer
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from html_text import get_text
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
 
 BASE = "https://ko.wikipedia.org"
 LIST_URL = "https://ko.wikipedia.org/wiki/2025년_대한민국의_텔레비전_드라마_목록"
@@ -35,6 +45,8 @@ HEADERS = {
 }
 SLEEP = 0.12
 WORKERS = 8
+CACHE_NAME = "drama_wiki_cache"  # → drama_wiki_cache.sqlite
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
 
 # ---- 섹션 키워드 ----
 ALLOW_SECTIONS = [
@@ -69,78 +81,178 @@ CHANNEL_WORDS = (
 )
 OST_WORDS = ("OST", "Special Track", "스페셜", "드라마 스페셜")
 
+# 키워드 묶음별 한 번의 정규식 검색으로 포함 여부 판정 (any(w in t ...) 반복 대신)
+def _words_re(words) -> re.Pattern:
+    return re.compile("|".join(map(re.escape, words)))
+
+CREW_RE    = _words_re(CREW_WORDS)
+CHANNEL_RE = _words_re(CHANNEL_WORDS)
+OST_RE     = _words_re(OST_WORDS)
+ALLOW_SECTION_RE = _words_re(ALLOW_SECTIONS)
+BLOCK_SECTION_RE = _words_re(BLOCK_SECTIONS)
+
 def clean_text(s: str) -> str:
     if not s: return ""
-    s = RE_FOOT.sub("", s)           # 각주 제거
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
+    # 각주 제거 후 split/join으로 공백 정리 + 양끝 strip을 한 번에
+    return " ".join(RE_FOOT.sub("", s).split())
 
 def is_noise_line(t: str) -> bool:
     """크루/OST/방송사/스페셜 등 노이즈 문장 거르기"""
     # 작품명 괄호 + 크루/OST 키워드 동시 등장 → 노이즈로 간주
     has_angle = ("《" in t and "》" in t)
-    if any(w in t for w in OST_WORDS):
+    if OST_RE.search(t):
         return True
-    if any(w in t for w in CREW_WORDS):
-        if has_angle:
-            return True
-    if has_angle and any(w in t for w in CHANNEL_WORDS):
+    has_crew = CREW_RE.search(t) is not None
+    if has_crew and has_angle:
+        return True
+    has_channel = CHANNEL_RE.search(t) is not None
+    if has_angle and has_channel:
         return True
     # 채널명이 잔뜩 섞여 있는 작업 이력 문장
-    if any(w in t for w in CHANNEL_WORDS) and any(w in t for w in CREW_WORDS):
+    if has_channel and has_crew:
         return True
     return False
 
+# ---- 요청 간격 제한 ----
+_RATE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+def wait_turn() -> None:
+    """모든 워커 합쳐 요청 사이 최소 SLEEP 간격 보장: 잠금 안에서 다음 허용 시각만 예약, 대기는 잠금 밖에서"""
+    global _next_request_at
+    with _RATE_LOCK:
+        now = time.monotonic()
+        at = max(now, _next_request_at)
+        _next_request_at = at + SLEEP
+    if at > now:
+        time.sleep(at - now)
+
+def polite_delay(r: requests.Response, *args, **kwargs) -> None:
+    """응답 훅: 실제 네트워크 응답일 때만 다음 요청 차례를 기다림 (캐시 응답은 바로 진행)"""
+    if not getattr(r, "from_cache", False):
+        wait_turn()
+
 # ---- 세션/요청 ----
-def make_session() -> requests.Session:
-    s = requests.Session()
+def make_session(use_cache: bool = True) -> requests.Session:
+    # 재실행 시 이미 받은 문서는 로컬 SQLite 캐시에서 읽음 (GET, 하루 유지)
+    if use_cache and CachedSession is not None:
+        s = CachedSession(CACHE_NAME, expire_after=CACHE_TTL, allowable_methods=("GET",))
+    else:
+        s = requests.Session()
     s.headers.update(HEADERS)
+    # 요청 간격은 워커 전체 공용 limiter로 조절 (캐시 적중 시 대기 없음)
+    s.hooks["response"].append(polite_delay)
     retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429,500,502,503,504])
     adapter = HTTPAdapter(max_retries=retry, pool_connections=64, pool_maxsize=64)
     s.mount("https://", adapter); s.mount("http://", adapter)
     return s
 
-def get_soup(session: requests.Session, url: str) -> BeautifulSoup:
+# 목록 페이지는 wikitable 표만 파싱 (나머지 본문은 객체로 만들지 않음)
+# 파싱 중에는 class가 'wikitable sortable' 같은 통 문자열로 넘어오므로 토큰 단위로 확인
+def _is_wikitable(cls) -> bool:
+    return bool(cls) and "wikitable" in (cls.split() if isinstance(cls, str) else cls)
+
+WIKITABLE_STRAINER = SoupStrainer("table", class_=_is_wikitable)
+
+def get_soup(session: requests.Session, url: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
     r = session.get(url, timeout=20)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "lxml")
+    return BeautifulSoup(r.content, "lxml", parse_only=parse_only)  # 바이트 그대로 넘겨 파서가 meta charset으로 디코딩
+
+def get_doc(session: requests.Session, url: str) -> HtmlElement:
+    """상세 페이지는 lxml 트리로 바로 파싱 (XPath로 블록/섹션 판정)"""
+    r = session.get(url, timeout=20)
+    r.raise_for_status()
+    return lxml.html.fromstring(r.content)
+
+# ---- XPath (모듈 로드 시 한 번만 컴파일) ----
+TITLE_XPATH = etree.XPath("//*[@id='firstHeading']")
+ROOT_XPATH  = etree.XPath(
+    "//*[@id='mw-content-text']"
+    "/div[contains(concat(' ', normalize-space(@class), ' '), ' mw-parser-output ')]"
+)
+
+# $root(본문) 안쪽 노드만: root를 조상으로 가진 요소
+_INSIDE_ROOT = "count(ancestor::* | $root) = count(ancestor::*)"
+# navbox/sidebar/sistersitebox/metadata 블록, infobox 표, references/toc
+_SKIP_BLOCK = (
+    "contains(@class, 'navbox') or contains(@class, 'sidebar')"
+    " or contains(@class, 'sistersitebox') or contains(@class, 'metadata')"
+    " or (self::table and contains(@class, 'infobox'))"
+    " or @id = 'references' or @id = 'toc'"
+)
+# 자신~root 사이에 제외 블록이 없는 ul/dl/table (문서 순서, 한 번에 수집)
+BLOCKS_XPATH = etree.XPath(
+    f".//*[self::ul or self::dl or self::table][not(ancestor-or-self::*[{_INSIDE_ROOT}][{_SKIP_BLOCK}])]"
+)
+LI_XPATH    = etree.XPath("./li")
+DTDD_XPATH  = etree.XPath("./dt|./dd")
+CELLS_XPATH = etree.XPath(".//td|.//th")
+ITEM_XPATHS = {"ul": LI_XPATH, "dl": DTDD_XPATH, "table": CELLS_XPATH}
+
+# (허용 섹션 여부, 태그) 조회 순서: 허용 섹션 ul → dl → table, 없으면 전체 영역 ul → dl → table
+SCAN_ORDER = [(True, "ul"), (True, "dl"), (True, "table"),
+              (False, "ul"), (False, "dl"), (False, "table")]
 
 # ---- 제목 ----
-def extract_title(soup: BeautifulSoup) -> str:
-    h1 = soup.select_one("#firstHeading")
-    return clean_text(h1.get_text()) if h1 else ""
+def extract_title(doc: HtmlElement) -> str:
+    h1 = TITLE_XPATH(doc)
+    return clean_text(get_text(h1[0])) if h1 else ""
 
 # ---- 섹션/스코프 판정 ----
-def _skip_block(tag: Tag) -> bool:
-    if not isinstance(tag, Tag): return True
-    cls = " ".join(tag.get("class", []))
-    if any(x in cls for x in ["navbox", "vertical-navbox", "sidebar", "sistersitebox", "metadata"]):
-        return True
-    if tag.name == "table" and "infobox" in cls:
-        return True
-    if tag.has_attr("id") and tag["id"] in ("references", "toc"):
-        return True
-    return False
+HEADING_TAGS = ("h2", "h3", "h4")
 
-def _nearest_prev_heading_text(root: Tag, node: Tag) -> str:
-    cur = node
-    while cur is not None and cur is not root:
-        prev = cur.previous_sibling
-        while prev:
-            if isinstance(prev, Tag) and prev.name in ("h2", "h3", "h4"):
-                return clean_text(prev.get_text())
-            prev = prev.previous_sibling
-        cur = cur.parent
-    return ""
-
-def _in_allowed_section(root: Tag, node: Tag) -> bool:
-    sec = _nearest_prev_heading_text(root, node)
+def _heading_finder(root: HtmlElement):
+    """
+    본문(root)별 '가장 가까운 앞쪽 h2/h3/h4 제목' 조회 함수 생성.
+    - 부모마다 자식 목록을 한 번만 훑어 자식별 직전 제목을 기록
+    - 노드 → 조상 방향으로 올라가며 처음 만난 단계의 제목 사용 (root 바깥은 보지 않음)
+    - 한 번 구한 노드/조상의 결과는 캐시 → 블록마다 형제를 다시 거슬러 올라가지 않음
+    """
+    by_parent: Dict[HtmlElement, Dict[HtmlElement, Optional[str]]] = {}
+    resolved: Dict[HtmlElement, str] = {}
+
+    def level_index(parent: HtmlElement) -> Dict[HtmlElement, Optional[str]]:
+        idx = by_parent.get(parent)
+        if idx is None:
+            idx, cur = {}, None
+            for ch in parent.iterchildren():
+                idx[ch] = cur
+                if ch.tag in HEADING_TAGS:
+                    cur = clean_text(get_text(ch))
+            by_parent[parent] = idx
+        return idx
+
+    def nearest(node: HtmlElement) -> str:
+        chain, sec = [], ""
+        cur = node
+        while cur is not None and cur is not root:
+            if cur in resolved:
+                sec = resolved[cur]; break
+            chain.append(cur)
+            parent = cur.getparent()
+            if parent is None:
+                break
+            h = level_index(parent)[cur]
+            if h is not None:
+                sec = h; break
+            cur = parent
+        for n in chain:
+            resolved[n] = sec
+        return sec
+
+    return nearest
+
+@lru_cache(maxsize=512)
+def _section_allowed(sec: str) -> bool:
+    """섹션 제목 → 허용 여부 (같은 제목은 한 번만 판정)"""
     if not sec:
         return False
     s = sec.split("[", 1)[0].split(":", 1)[0]
-    if any(b in s for b in BLOCK_SECTIONS):
+    if BLOCK_SECTION_RE.search(s):
         return False
-    return any(a in s for a in ALLOW_SECTIONS)
+    return ALLOW_SECTION_RE.search(s) is not None
+
 
 # ---- 파서 (엄격 버전) ----
 def parse_role_line_strict(text: str) -> Optional[Dict[str, str]]:
@@ -149,6 +261,14 @@ def parse_role_line_strict(text: str) -> Optional[Dict[str, str]]:
     - 콜론 필수, 대시(-/–/—) 필수, 왼쪽에 '역' 포함 필수
     - 배역명에서 괄호 제거(아역 등), '역'은 유지
     """
+    # 필수 문자(콜론/대시/'역')가 하나라도 없으면 정리·정규식 없이 바로 탈락
+    if not text or "역" not in text:
+        return None
+    if ":" not in text and "：" not in text:
+        return None
+    if "-" not in text and "–" not in text and "—" not in text:
+        return None
+
     t = clean_text(text)
     if not t:
         return None
@@ -180,82 +300,51 @@ def parse_role_line_strict(text: str) -> Optional[Dict[str, str]]:
     return {"character_name": character_name, "role_type": role_type}
 
 # ---- 상세 수집기 ----
-def _scan_blocks(root: Tag, scoped_only: bool, tag_names: List[str]) -> List[Tag]:
-    out = []
-    for tg in root.find_all(tag_names):
-        anc, skip = tg, False
-        while anc and anc is not root:
-            if _skip_block(anc):
-                skip = True; break
-            anc = anc.parent
-        if skip:
-            continue
-        if scoped_only and not _in_allowed_section(root, tg):
-            continue
-        out.append(tg)
-    return out
-
-def scrape_detail(session: requests.Session, url: str, title_fallback: str = "") -> List[Dict[str, str]]:
-    soup = get_soup(session, url)
-    title = extract_title(soup) or title_fallback
-    root = soup.select_one("#mw-content-text > div.mw-parser-output")
-    if not root:
+def _classify_blocks(root: HtmlElement) -> Dict[tuple, List[HtmlElement]]:
+    """ul/dl/table 블록을 한 번만 훑어 (허용 섹션 여부, 태그) 버킷으로 분류"""
+    buckets: Dict[tuple, List[HtmlElement]] = {key: [] for key in SCAN_ORDER}
+    nearest_heading = _heading_finder(root)
+    for blk in BLOCKS_XPATH(root, root=root):
+        buckets[(_section_allowed(nearest_heading(blk)), blk.tag)].append(blk)
+    return buckets
+
+def extract_person_rows(doc: HtmlElement, title_fallback: str = "") -> List[Dict[str, str]]:
+    """파싱된 상세 페이지 → 배역 행 목록"""
+    title = extract_title(doc) or title_fallback
+    found = ROOT_XPATH(doc)
+    if not found:
         return []
+    root = found[0]
 
     rows: List[Dict[str, str]] = []
 
-    # 1) 허용 섹션 내부 우선
-    for ul in _scan_blocks(root, True, ["ul"]):
-        for li in ul.find_all("li", recursive=False):
-            d = parse_role_line_strict(li.get_text())
-            if d:
-                rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
-
-    # 2) 허용 섹션 내 dl/table도 시도
-    if not rows:
-        for dl in _scan_blocks(root, True, ["dl"]):
-            for node in dl.find_all(["dt", "dd"], recursive=False):
-                d = parse_role_line_strict(node.get_text())
-                if d:
-                    rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
-
-    if not rows:
-        for tb in _scan_blocks(root, True, ["table"]):
-            for cell in tb.find_all(["td", "th"]):
-                d = parse_role_line_strict(cell.get_text())
-                if d:
-                    rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
-
-    # 3) 폴백: 전체 영역
-    if not rows:
-        for ul in _scan_blocks(root, False, ["ul"]):
-            for li in ul.find_all("li", recursive=False):
-                d = parse_role_line_strict(li.get_text())
-                if d:
-                    rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
-
-    if not rows:
-        for dl in _scan_blocks(root, False, ["dl"]):
-            for node in dl.find_all(["dt", "dd"], recursive=False):
-                d = parse_role_line_strict(node.get_text())
-                if d:
-                    rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
-
-    if not rows:
-        for tb in _scan_blocks(root, False, ["table"]):
-            for cell in tb.find_all(["td", "th"]):
-                d = parse_role_line_strict(cell.get_text())
+    # 허용 섹션 우선, 비면 나머지 영역으로 폴백 — 결과가 처음 나온 버킷에서 멈춤
+    # (허용 섹션 블록은 이미 파싱해 비었으므로 폴백 단계에서 다시 파싱하지 않음)
+    buckets = _classify_blocks(root)
+    for key in SCAN_ORDER:
+        items_xpath = ITEM_XPATHS[key[1]]
+        for blk in buckets[key]:
+            for node in items_xpath(blk):
+                d = parse_role_line_strict(get_text(node))
                 if d:
                     rows.append({"title": title, "role_type": d["role_type"], "character_name": d["character_name"], "order_no": 1})
+        if rows:
+            break
 
     print(f"[detail] {title} -> rows:{len(rows)}")
     return rows
 
+def scrape_detail(session: requests.Session, url: str, title_fallback: str = "") -> List[Dict[str, str]]:
+    return extract_person_rows(get_doc(session, url), title_fallback)
+
 # ---- 목록 페이지 ----
 def extract_list_items(session: requests.Session, list_url: str) -> List[Dict]:
-    soup = get_soup(session, list_url)
-    items: List[Dict] = []
-    tables = soup.select("#mw-content-text table.wikitable, #content table.wikitable")
+    return parse_list_items(get_soup(session, list_url, parse_only=WIKITABLE_STRAINER))
+
+def parse_list_items(soup: BeautifulSoup) -> List[Dict]:
+    # (URL, 제목) 키로 바로 모음 → 삽입 순서 유지 + 중복 제거를 한 번에
+    found: Dict[Tuple[Optional[str], str], None] = {}
+    tables = soup.find_all("table", class_="wikitable")
 
     def norm(x: str) -> str:
         return clean_text(x).replace(" ", "")
@@ -298,23 +387,35 @@ def extract_list_items(session: requests.Session, list_url: str) -> List[Dict]:
                 if href.startswith("/wiki/") and ":" not in href and not is_red:
                     detail_url = urljoin(BASE, href)
 
-            items.append({"title_fallback": title_text, "detail_url": detail_url})
+            found[(detail_url, title_text)] = None
+
+    return [{"title_fallback": t, "detail_url": u} for u, t in found]
 
-    # dedupe
-    seen, uniq = set(), []
-    for it in items:
-        key = (it["detail_url"], it["title_fallback"])
+# ---- 저장 ----
+def save_rows(rows: List[Dict[str, str]], out: str = "drama_person.csv") -> None:
+    # 완전 중복 행 제거 → (title, character_name) 안정 정렬 → 표준 csv로 바로 기록
+    seen = set()
+    uniq = []
+    for r in rows:
+        key = (r["title"], r["role_type"], r["character_name"], r["order_no"])
         if key not in seen:
-            seen.add(key); uniq.append(it)
-    return uniq
+            seen.add(key); uniq.append(r)
+    uniq.sort(key=lambda r: (r["title"], r["character_name"]))
+
+    with open(out, "w", newline="", encoding="utf-8-sig") as f:
+        w = csv.DictWriter(f, fieldnames=["title", "role_type", "character_name", "order_no"])
+        w.writeheader()
+        w.writerows(uniq)
+    print(f"[✓] 저장 완료: {out} (행 수: {len(uniq)})")
 
 # ---- 메인 ----
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--url", required=False, help="단일 상세 페이지 URL (없으면 목록→상세 전체 수집)")
+    ap.add_argument("--no-cache", action="store_true", help="응답 캐시를 쓰지 않고 모두 새로 요청")
     args = ap.parse_args()
 
-    session = make_session()
+    session = make_session(use_cache=not args.no_cache)
     rows: List[Dict[str, str]] = []
 
     if args.url:
@@ -328,20 +429,14 @@ def main():
                 ex.submit(scrape_detail, session, it["detail_url"], it["title_fallback"])
                 for it in items if it["detail_url"]
             ]
+            # 요청 간격은 세션 응답 훅(polite_delay → wait_turn)에서 지킴 → 수집 루프는 쉬지 않고 결과만 모음
             for fut in as_completed(futs):
-                try:
-                    rows.extend(fut.result())
-                finally:
-                    time.sleep(SLEEP)
+                rows.extend(fut.result())
 
     if not rows:
         print("[-] 추출 결과 없음"); return
 
-    df = pd.DataFrame(rows, columns=["title", "role_type", "character_name", "order_no"])
-    df = df.drop_duplicates()
-    df = df.sort_values(by=["title", "character_name"], kind="stable")
-    df.to_csv("drama_person.csv", index=False, encoding="utf-8-sig")
-    print(f"[✓] 저장 완료: drama_person.csv (행 수: {len(df)})")
+    save_rows(rows)
 
 if __name__ == "__main__":
     main()
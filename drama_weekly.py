@@ -5,57 +5,125 @@ drama_weekly.py — 위키 드라마 인포박스에서 방송시간/런타임 
   1) 제목 격자/괄호 제거: 《 》, 〈 〉, << >>, 「 」, 『 』, « », < >
   2) 런타임 자동 추정(후처리): runtime 비었고 start_time이 범위면 40~120분에서만 계산
      ※ 라벨 기반 런타임 있으면 절대 덮어쓰지 않음 → '철벽 구분' 유지
+  3) 인포박스 필드는 MediaWiki API(0번 섹션 위키텍스트) 우선, 못 찾으면 HTML 인포박스로 폴백
 """
 
 import re
+import csv
 import time
 import argparse
-from typing import List, Dict, Optional
-from urllib.parse import urljoin
+import threading
+from typing import List, Dict, Optional, Tuple
+from pathlib import Path
+from html import unescape
+from urllib.parse import urljoin, urlparse, unquote
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import requests
-import pandas as pd
-from bs4 import BeautifulSoup
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+from bs4 import BeautifulSoup, SoupStrainer
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from html_text import get_text
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # pyarrow 미설치 시 Feather 사본 없이 CSV만 저장
+    pa = feather = None
 
 BASE = "https://ko.wikipedia.org"
 LIST_URL = "https://ko.wikipedia.org/wiki/2025년_대한민국의_텔레비전_드라마_목록"
+API_URL = f"{BASE}/w/api.php"
 HEADERS = {
     "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                    "AppleWebKit/537.36 (KHTML, like Gecko) "
                    "Chrome/122.0.0.0 Safari/537.36"),
     "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.7,en;q=0.5",
 }
-SLEEP = 0.6
+RATE_LIMIT = 8  # 모든 워커 합쳐 초당 최대 요청 수
+WORKERS = 8
+CACHE_NAME = "drama_wiki_cache"  # → drama_wiki_cache.sqlite
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
+
+# ---- 정규식(모듈 로드 시 한 번만 컴파일) ----
+FOOTNOTE_RE = re.compile(r"\[[^\]]*\]")
+# 제목 격자/괄호 문자 삭제 테이블 (<< >>도 < > 문자 단위로 함께 지워짐)
+BRACKET_TABLE = str.maketrans("", "", "《》〈〉「」『』«»<>")
 
 # ---------------- utils ----------------
 def clean_text(s: str) -> str:
     if not s:
         return ""
-    s = re.sub(r"\[[^\]]*\]", "", s)   # 각주 제거
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
+    # 각주 제거 후 split/join으로 공백 정리 + 양끝 strip을 한 번에
+    return " ".join(FOOTNOTE_RE.sub("", s).split())
 
 def strip_brackets(title: str) -> str:
     """제목의 《 》, 〈 〉, << >>, 「 」, 『 』, « », < > 제거"""
     if not title:
         return ""
-    # 격자/괄호 문자 제거
-    title = re.sub(r"[《》〈〉「」『』«»<>]", "", title)
-    title = re.sub(r"<<|>>", "", title)
-    # 공백 정리
-    title = re.sub(r"\s+", " ", title).strip()
-    return title
-
-def get_soup(url: str) -> BeautifulSoup:
-    r = requests.get(url, headers=HEADERS, timeout=30)
+    # 격자/괄호 문자 제거(translate) 후 공백 정리
+    return " ".join(title.translate(BRACKET_TABLE).split())
+
+# ---- 세션/요청 ----
+_RATE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+def wait_turn() -> None:
+    """모든 워커 합쳐 초당 RATE_LIMIT건 이하로 유지: 잠금 안에서 다음 허용 시각만 예약, 대기는 잠금 밖에서"""
+    global _next_request_at
+    with _RATE_LOCK:
+        now = time.monotonic()
+        at = max(now, _next_request_at)
+        _next_request_at = at + 1.0 / RATE_LIMIT
+    if at > now:
+        time.sleep(at - now)
+
+def polite_delay(r: requests.Response, *args, **kwargs) -> None:
+    """응답 훅: 실제 네트워크 응답일 때만 다음 요청 차례를 기다림 (캐시 응답은 바로 진행)"""
+    if not getattr(r, "from_cache", False):
+        wait_turn()
+
+def make_session(use_cache: bool = True) -> requests.Session:
+    # 재실행 시 이미 받은 문서는 로컬 SQLite 캐시에서 읽음 (GET, 하루 유지)
+    if use_cache and CachedSession is not None:
+        s = CachedSession(CACHE_NAME, expire_after=CACHE_TTL, allowable_methods=("GET",))
+    else:
+        s = requests.Session()
+    s.headers.update(HEADERS)
+    # 요청 간격은 워커 전체 공용 limiter로 조절 (캐시 적중 시 대기 없음)
+    s.hooks["response"].append(polite_delay)
+    # 요청은 ko.wikipedia.org 한 호스트뿐 → 호스트 풀은 몇 개면 충분, 호스트당 연결은 워커 수만큼 유지
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429,500,502,503,504])
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=WORKERS)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+    return s
+
+# 목록 페이지는 wikitable 표만 파싱 (나머지 본문은 객체로 만들지 않음)
+# 파싱 중에는 class가 'wikitable sortable' 같은 통 문자열로 넘어오므로 토큰 단위로 확인
+def _is_wikitable(cls) -> bool:
+    return bool(cls) and "wikitable" in (cls.split() if isinstance(cls, str) else cls)
+
+WIKITABLE_STRAINER = SoupStrainer("table", class_=_is_wikitable)
+
+def get_soup(session: requests.Session, url: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    r = session.get(url, timeout=30)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "lxml")
+    return BeautifulSoup(r.content, "lxml", parse_only=parse_only)  # 바이트 그대로 넘겨 파서가 meta charset으로 디코딩
 
 # ---------------- 목록에서 제목/링크 ----------------
-def extract_list_items(list_url: str) -> List[Dict]:
-    soup = get_soup(list_url)
-    items: List[Dict] = []
-    tables = soup.select("#mw-content-text table.wikitable, #content table.wikitable")
+def extract_list_items(session: requests.Session, list_url: str) -> List[Dict]:
+    return parse_list_items(get_soup(session, list_url, parse_only=WIKITABLE_STRAINER))
+
+def parse_list_items(soup: BeautifulSoup) -> List[Dict]:
+    # (제목, URL) 키로 바로 모음 → 삽입 순서 유지 + 중복 제거를 한 번에
+    found: Dict[Tuple[str, Optional[str]], None] = {}
+    tables = soup.find_all("table", class_="wikitable")
 
     def norm(x: str) -> str:
         return clean_text(x).replace(" ", "")
@@ -104,36 +172,52 @@ def extract_list_items(list_url: str) -> List[Dict]:
                     detail_url = urljoin(BASE, href)
 
             if title_text:
-                items.append({"title": title_text, "detail_url": detail_url})
+                found[(title_text, detail_url)] = None
 
-    # 중복 제거
-    seen = set()
-    uniq: List[Dict] = []
-    for it in items:
-        key = (it["title"], it["detail_url"])
-        if key not in seen:
-            seen.add(key)
-            uniq.append(it)
-    return uniq
+    return [{"title": t, "detail_url": u} for t, u in found]
 
 # ---------------- 방송시간/런타임 파싱 ----------------
 DAY_PATTERN = r"(월|화|수|목|금|토|일)요일"
 DAY_CONNECTOR = r"[·,/\s]*(?:및)?[·,/\s]*"
+DAY_RE          = re.compile(DAY_PATTERN)
+DAY_DOT_PAIR_RE = re.compile(r"(월|화|수|목|금|토|일)\s*·\s*(월|화|수|목|금|토|일)")
+DAY_PAIR_RE     = re.compile(rf"(월|화|수|목|금|토|일){DAY_CONNECTOR}(월|화|수|목|금|토|일)")
+
+BAM12_RE      = re.compile(r"밤\s*12\s*시")
+JAJEONG12_RE  = re.compile(r"자정\s*12\s*시")
+JAJEONG_RE    = re.compile(r"\b자정\b")
+JEONGO12_RE   = re.compile(r"정오\s*12\s*시")
+JEONGO_RE     = re.compile(r"\b정오\b")
+
+AMPM_WORDS = r"(오전|오후|밤|새벽|저녁|낮)"
+RANGE_SEPS = "~-–—"  # 범위 구분자 (정규식의 [~\-–—]와 동일)
+TIME_RANGE_AMPM_RE = re.compile(
+    rf"{AMPM_WORDS}?\s*(\d{{1,2}}):(\d{{2}}).*?[~\-–—]\s*{AMPM_WORDS}?\s*(\d{{1,2}}):(\d{{2}})"
+)
+AM_CONTEXT_RE = re.compile(r"(오전|AM|am|새벽)\b")
+PM_CONTEXT_RE = re.compile(r"(오후|PM|pm|저녁|밤|늦은밤)\b")
+HHMM_RE       = re.compile(r"(\d{1,2}):(\d{2})")
+KO_TIME       = rf"{AMPM_WORDS}?\s*(\d{{1,2}})\s*시(?:\s*(\d{{1,2}})\s*분)?"
+KO_TIME_RANGE_RE = re.compile(rf"{KO_TIME}\s*[~\-–—]\s*{KO_TIME}")
+KO_TIME_RE       = re.compile(KO_TIME)
+
+RUNTIME_UNIT_RE = re.compile(r"(시간|분)")
+RUNTIME_HM_RE   = re.compile(r"(\d+)\s*시간\s*(\d+)\s*분")
+RUNTIME_H_RE    = re.compile(r"(\d+)\s*시간")
+RUNTIME_M_RE    = re.compile(r"(\d+)\s*분")
 
 def extract_days(text: str) -> List[str]:
     t = text
     # '수·목' → '수요일 목요일', '수/목', '수,목', '수 및 목' → 동일 처리
-    t_expanded = re.sub(
-        r"(월|화|수|목|금|토|일)\s*·\s*(월|화|수|목|금|토|일)",
+    t_expanded = DAY_DOT_PAIR_RE.sub(
         lambda m: f"{m.group(1)}요일 {m.group(2)}요일",
         t
     )
-    t_expanded = re.sub(
-        rf"(월|화|수|목|금|토|일){DAY_CONNECTOR}(월|화|수|목|금|토|일)",
+    t_expanded = DAY_PAIR_RE.sub(
         lambda m: f"{m.group(1)}요일 {m.group(2)}요일",
         t_expanded
     )
-    days = re.findall(DAY_PATTERN, t_expanded)
+    days = DAY_RE.findall(t_expanded)
     out = []
     for d in days:
         s = f"{d}요일"
@@ -144,11 +228,11 @@ def extract_days(text: str) -> List[str]:
 def normalize_special_words(s: str) -> str:
     """자정/정오/밤 12시 등을 오전/오후 표기로 정규화."""
     t = s
-    t = re.sub(r"밤\s*12\s*시", "오전 12시", t)
-    t = re.sub(r"자정\s*12\s*시", "오전 12시", t)
-    t = re.sub(r"\b자정\b", "오전 12시", t)
-    t = re.sub(r"정오\s*12\s*시", "오후 12시", t)
-    t = re.sub(r"\b정오\b", "오후 12시", t)
+    t = BAM12_RE.sub("오전 12시", t)
+    t = JAJEONG12_RE.sub("오전 12시", t)
+    t = JAJEONG_RE.sub("오전 12시", t)
+    t = JEONGO12_RE.sub("오후 12시", t)
+    t = JEONGO_RE.sub("오후 12시", t)
     return t
 
 def detect_ampm(word: Optional[str]) -> Optional[str]:
@@ -182,11 +266,15 @@ def extract_time_range(text: str) -> str:
     raw = clean_text(text)
     t = normalize_special_words(raw)
 
+    # 단계 우선순위(0→3)는 그대로 두고, 패턴에 꼭 필요한 문자(':', '시', 범위 구분자)가
+    # 없는 단계는 정규식을 돌리지 않고 건너뜀
+    has_sep = any(c in t for c in RANGE_SEPS)
+    # HH:MM 목록을 먼저 한 번만 스캔 → 0단계(범위)는 시각이 2개 이상일 때만 시도
+    # (0단계가 매칭되면 구분자 양쪽에 HH:MM이 하나씩 있으므로 findall도 항상 2개 이상)
+    colon_times = HHMM_RE.findall(t) if ":" in t else []
+
     # 0) AM/PM + HH:MM ~ AM/PM + HH:MM (양쪽 또는 한쪽 컨텍스트)
-    m = re.search(
-        r"(오전|오후|밤|새벽|저녁|낮)?\s*(\d{1,2}):(\d{2}).*?[~\-–—]\s*(오전|오후|밤|새벽|저녁|낮)?\s*(\d{1,2}):(\d{2})",
-        t
-    )
+    m = TIME_RANGE_AMPM_RE.search(t) if has_sep and len(colon_times) >= 2 else None
     if m:
         am1, h1, m1, am2, h2, m2 = m.groups()
         # 컨텍스트 상속
@@ -199,14 +287,13 @@ def extract_time_range(text: str) -> str:
         return f"{H1:02d}:{int(m1):02d}~{H2:02d}:{int(m2):02d}"
 
     # 1) HH:MM ~ HH:MM (문장 내 공통 컨텍스트)
-    context = None
-    if re.search(r"(오전|AM|am|새벽)\b", t):
-        context = "AM"
-    elif re.search(r"(오후|PM|pm|저녁|밤|늦은밤)\b", t):
-        context = "PM"
-
-    colon_times = re.findall(r"(\d{1,2}):(\d{2})", t)
     if colon_times:
+        context = None
+        if AM_CONTEXT_RE.search(t):
+            context = "AM"
+        elif PM_CONTEXT_RE.search(t):
+            context = "PM"
+
         def conv(hm, ampm=context):
             h, m_ = int(hm[0]), int(hm[1])
             H = to_24h_hour(h, ampm)
@@ -215,12 +302,12 @@ def extract_time_range(text: str) -> str:
             return f"{conv(colon_times[0])}~{conv(colon_times[1])}"
         return conv(colon_times[0])
 
-    # 2) 한글 시각 범위: (오전/오후) H시 M분 ~ (오전/오후) H시 M분
-    m = re.search(
-        r"(오전|오후|밤|새벽|저녁|낮)?\s*(\d{1,2})\s*시(?:\s*(\d{1,2})\s*분)?\s*[~\-–—]\s*"
-        r"(오전|오후|밤|새벽|저녁|낮)?\s*(\d{1,2})\s*시(?:\s*(\d{1,2})\s*분)?",
-        t
-    )
+    n_si = t.count("시")
+    if not n_si:
+        return ""
+
+    # 2) 한글 시각 범위: (오전/오후) H시 M분 ~ (오전/오후) H시 M분 ('시'가 2번 이상일 때만)
+    m = KO_TIME_RANGE_RE.search(t) if has_sep and n_si >= 2 else None
     if m:
         am1, h1, mm1, am2, h2, mm2 = m.groups()
         mm1 = int(mm1) if mm1 else 0
@@ -234,7 +321,7 @@ def extract_time_range(text: str) -> str:
         return f"{H1:02d}:{mm1:02d}~{H2:02d}:{mm2:02d}"
 
     # 3) 한글 시각 단일
-    m = re.search(r"(오전|오후|밤|새벽|저녁|낮)?\s*(\d{1,2})\s*시(?:\s*(\d{1,2})\s*분)?", t)
+    m = KO_TIME_RE.search(t)
     if m:
         am, h, mm = m.groups()
         H = to_24h_hour(int(h), detect_ampm(am))
@@ -248,19 +335,19 @@ def parse_runtime_minutes_strict(text: str) -> Optional[int]:
     t = clean_text(text)
 
     # 편성 특징(요일/범위/콜론) 포함 시 런타임 아님
-    if re.search(DAY_PATTERN, t) or "~" in t or ":" in t:
+    if DAY_RE.search(t) or "~" in t or ":" in t:
         return None
 
-    if not re.search(r"(시간|분)", t):
+    if not RUNTIME_UNIT_RE.search(t):
         return None
 
-    m = re.search(r"(\d+)\s*시간\s*(\d+)\s*분", t)
+    m = RUNTIME_HM_RE.search(t)
     if m:
         return int(m.group(1)) * 60 + int(m.group(2))
-    m = re.search(r"(\d+)\s*시간", t)
+    m = RUNTIME_H_RE.search(t)
     if m:
         return int(m.group(1)) * 60
-    m = re.search(r"(\d+)\s*분", t)
+    m = RUNTIME_M_RE.search(t)
     if m:
         return int(m.group(1))
     return None
@@ -269,33 +356,13 @@ def parse_runtime_minutes_strict(text: str) -> Optional[int]:
 TIME_LABEL_RE = re.compile(r"(방송시간|방영시간)")
 RUNTIME_LABEL_RE = re.compile(r"(상영시간|방송분량|러닝타임|분량)")
 
-def extract_broadcast_fields_from_infobox(soup: BeautifulSoup) -> Dict[str, str]:
+def broadcast_fields_from_text(time_text: str, runtime_text: str) -> Dict[str, str]:
+    """라벨로 골라낸 방송시간/런타임 원문 → dow, start_time, runtime"""
     out = {"dow": "", "start_time": "", "runtime": ""}
 
-    box = soup.select_one("#mw-content-text > div.mw-content-ltr.mw-parser-output > table.infobox")
-    if not box:
-        return out
-
-    time_td = None
-    runtime_td = None
-
-    # 1) 라벨(th) 기반 안전 탐색 (상호 배제)
-    for tr in box.select("tr"):
-        th = tr.find("th"); td = tr.find("td")
-        if not td:
-            continue
-        label = clean_text(th.get_text()).replace(" ", "") if th else ""
-        if not time_td and TIME_LABEL_RE.search(label):
-            time_td = td
-        elif not runtime_td and RUNTIME_LABEL_RE.search(label):
-            runtime_td = td
-        if time_td and runtime_td:
-            break
-
     # 방송시간 → dow, start_time
-    if time_td:
-        raw = time_td.get_text(separator=" ")
-        t = clean_text(raw)
+    if time_text:
+        t = clean_text(time_text)
         # 여러 표현이 섞여도 첫 문장 위주(재방/특집 등 자연히 뒤로 밀림)
         t_first = t.split(" / ")[0].split(" ; ")[0]
         days = extract_days(t_first)
@@ -306,14 +373,174 @@ def extract_broadcast_fields_from_infobox(soup: BeautifulSoup) -> Dict[str, str]
             out["start_time"] = trange
 
     # 런타임 → 라벨 기반에서만 엄격 파싱 (nth-child 폴백 금지, 편성 특징 배제)
-    if runtime_td:
-        rt = clean_text(runtime_td.get_text(separator=" ").strip())
+    if runtime_text:
+        rt = clean_text(runtime_text.strip())
         minutes = parse_runtime_minutes_strict(rt)
         if minutes is not None:
             out["runtime"] = f"{minutes}분"
 
     return out
 
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+# #mw-content-text > div.mw-content-ltr.mw-parser-output > table.infobox
+INFOBOX_XPATH = etree.XPath(
+    f"//*[@id='mw-content-text']/div[{_has_class('mw-content-ltr')} and {_has_class('mw-parser-output')}]"
+    f"/table[{_has_class('infobox')}]"
+)
+# 첫 th 라벨(공백 제거)에 방송시간/런타임 키워드가 있고 td도 있는 행만 한 번에 추림
+LABELED_ROWS_XPATH = etree.XPath(
+    ".//tr[.//td][(.//th)[1][re:test(translate(normalize-space(.), ' \u00a0', ''), $labels)]]",
+    namespaces={"re": "http://exslt.org/regular-expressions"},
+)
+LABEL_KEYWORDS = f"{TIME_LABEL_RE.pattern}|{RUNTIME_LABEL_RE.pattern}"
+FIRST_TH_XPATH = etree.XPath("(.//th)[1]")
+FIRST_TD_XPATH = etree.XPath("(.//td)[1]")
+
+def get_doc(session: requests.Session, url: str) -> HtmlElement:
+    r = session.get(url, timeout=30)
+    r.raise_for_status()
+    return lxml.html.fromstring(r.content)
+
+def extract_broadcast_fields_from_infobox(doc: HtmlElement) -> Dict[str, str]:
+    out = {"dow": "", "start_time": "", "runtime": ""}
+
+    found = INFOBOX_XPATH(doc)
+    if not found:
+        return out
+
+    time_td = None
+    runtime_td = None
+
+    # 1) 라벨(th) 기반 안전 탐색 (상호 배제) — 후보 행은 XPath로 추리고 라벨은 기존 규칙으로 재확인
+    for tr in LABELED_ROWS_XPATH(found[0], labels=LABEL_KEYWORDS):
+        th = FIRST_TH_XPATH(tr)[0]; td = FIRST_TD_XPATH(tr)[0]
+        label = clean_text(get_text(th, " ")).replace(" ", "")
+        if time_td is None and TIME_LABEL_RE.search(label):
+            time_td = td
+        elif runtime_td is None and RUNTIME_LABEL_RE.search(label):
+            runtime_td = td
+        if time_td is not None and runtime_td is not None:
+            break
+
+    return broadcast_fields_from_text(
+        get_text(time_td, " ") if time_td is not None else "",
+        get_text(runtime_td, " ") if runtime_td is not None else "",
+    )
+
+# ---------------- 인포박스 추출 (MediaWiki API: 0번 섹션 위키텍스트) ----------------
+# 렌더링된 HTML 전체 대신 문서 첫 섹션의 위키텍스트만 받아 인포박스 인자를 읽음
+WIKI_TOKEN_RE = re.compile(r"\{\{|\}\}|\[\[|\]\]|\|")
+WIKI_REF_RE   = re.compile(r"<ref[^>]*/>|<ref[^>]*>.*?</ref>", re.I | re.S)
+WIKI_BR_RE    = re.compile(r"<br\s*/?>", re.I)
+WIKI_TAG_RE   = re.compile(r"<[^>]+>")
+WIKI_LINK_RE  = re.compile(r"\[\[(?:[^\]|]*\|)?([^\]]*)\]\]")
+WIKI_TMPL_RE  = re.compile(r"\{\{([^{}]*)\}\}")
+WIKI_LIST_RE  = re.compile(r"^\s*[*#:]+", re.M)
+WIKI_QUOTE_RE = re.compile(r"'{2,}")
+WIKI_NOTE_TMPLS = {"efn", "refn", "sfn", "주석", "각주"}  # 값이 아니라 각주인 틀 → 통째로 제거
+
+def wiki_page_title(url: str) -> str:
+    """https://ko.wikipedia.org/wiki/제목 → 제목"""
+    return unquote(urlparse(url).path.split("/wiki/", 1)[-1])
+
+def template_params(wikitext: str) -> List[Tuple[str, str]]:
+    """최상위 틀의 이름 있는 인자 → [(이름, 값)]
+    값이 여러 줄이거나 안에 틀/링크가 있어도 그 안의 '|'는 인자 구분으로 보지 않음"""
+    raw: List[str] = []
+    depth = links = 0
+    start: Optional[int] = None  # 최상위 틀 안에서 현재 인자가 시작한 위치
+    for m in WIKI_TOKEN_RE.finditer(wikitext):
+        tok = m.group()
+        if tok == "{{":
+            depth += 1
+        elif tok == "}}":
+            if depth == 1 and start is not None:
+                raw.append(wikitext[start:m.start()])
+                start = None
+            depth = max(depth - 1, 0)
+        elif tok == "[[":
+            links += 1
+        elif tok == "]]":
+            links = max(links - 1, 0)
+        elif depth == 1 and links == 0:
+            if start is not None:
+                raw.append(wikitext[start:m.start()])
+            start = m.end()
+
+    params = []
+    for p in raw:
+        name, eq, value = p.partition("=")
+        if eq and not any(c in name for c in "{[<"):
+            params.append((name.strip(), value.strip()))
+    return params
+
+def _unwrap_template(m: re.Match) -> str:
+    # 틀 이름은 버리고 위치 인자만 남김: {{plainlist|...}}, {{ubl|a|b}}, {{nowrap|...}} 등의 값 보존
+    name, *args = m.group(1).split("|")
+    if name.strip().lower() in WIKI_NOTE_TMPLS:
+        return ""
+    return " ".join(a for a in args if "=" not in a)
+
+def wikitext_to_text(v: str) -> str:
+    """인포박스 값의 위키 마크업(각주/링크/태그/틀/목록/굵게) 제거 → 일반 텍스트"""
+    v = WIKI_REF_RE.sub("", v)
+    v = WIKI_BR_RE.sub(" ", v)
+    v = WIKI_TAG_RE.sub("", v)
+    v = WIKI_LINK_RE.sub(r"\1", v)
+    n = 1
+    while n:  # 중첩 틀은 안쪽부터 한 겹씩 풀기
+        v, n = WIKI_TMPL_RE.subn(_unwrap_template, v)
+    v = WIKI_LIST_RE.sub(" ", v)
+    v = WIKI_QUOTE_RE.sub("", v)
+    return clean_text(unescape(v))
+
+def extract_broadcast_fields_from_wikitext(wikitext: str) -> Dict[str, str]:
+    time_text = runtime_text = ""
+    # 1) 인자 이름 기반 탐색 (HTML 라벨과 같은 정규식, 상호 배제)
+    for name, value in template_params(wikitext):
+        label = name.replace(" ", "").replace("_", "")
+        if not time_text and TIME_LABEL_RE.search(label):
+            time_text = wikitext_to_text(value)
+        elif not runtime_text and RUNTIME_LABEL_RE.search(label):
+            runtime_text = wikitext_to_text(value)
+        if time_text and runtime_text:
+            break
+    return broadcast_fields_from_text(time_text, runtime_text)
+
+def fetch_fields_via_api(session: requests.Session, url: str) -> Optional[Dict[str, str]]:
+    """API로 인포박스 필드 추출. 요청 실패/문서 없음이면 None"""
+    params = {
+        "action": "parse", "page": wiki_page_title(url), "prop": "wikitext",
+        "section": 0, "redirects": 1, "format": "json", "formatversion": 2,
+    }
+    try:
+        r = session.get(API_URL, params=params, timeout=30)
+        r.raise_for_status()
+        wikitext = r.json().get("parse", {}).get("wikitext", "")
+    except (requests.RequestException, ValueError):
+        return None
+    if not wikitext:
+        return None
+    return extract_broadcast_fields_from_wikitext(wikitext)
+
+def fetch_broadcast_fields(session: requests.Session, url: str,
+                           doc: Optional[HtmlElement] = None) -> Dict[str, str]:
+    """API(위키텍스트) 우선, 비어 있는 필드만 렌더링 HTML 인포박스 값으로 채움
+    doc: 이미 받아 둔 상세 HTML 트리가 있으면 다시 요청하지 않고 그대로 사용 (drama_wiki)"""
+    fields = fetch_fields_via_api(session, url) or {"dow": "", "start_time": "", "runtime": ""}
+    if all(fields.values()):
+        return fields
+    # 위키텍스트에서 못 읽은 값(틀 모양이 달라 놓친 경우 등)은 필드별로 HTML 결과를 씀
+    if doc is None:
+        try:
+            doc = get_doc(session, url)
+        except requests.RequestException:
+            return fields
+    html_fields = extract_broadcast_fields_from_infobox(doc)
+    return {k: v or html_fields[k] for k, v in fields.items()}
+
 # ---------------- 후처리: 런타임 추정(항상 ON, '철벽 구분' 영향 없음) ----------------
 def maybe_infer_runtime(start_time: str,
                         runtime: str,
@@ -345,51 +572,83 @@ def maybe_infer_runtime(start_time: str,
     except Exception:
         return runtime
 
+# ---------------- 작품 1건 처리 ----------------
+def scrape_one(session: requests.Session, it: Dict, guard_min: int, guard_max: int) -> Dict[str, str]:
+    """상세 페이지 1건: 인포박스 추출 + 런타임 추정 → 출력 행"""
+    fields = {"dow": "", "start_time": "", "runtime": ""}
+    if it["detail_url"]:
+        try:
+            fields = fetch_broadcast_fields(session, it["detail_url"])
+        except Exception:
+            pass
+    return make_row(it, fields, guard_min, guard_max)
+
+def make_row(it: Dict, fields: Dict[str, str], guard_min: int, guard_max: int) -> Dict[str, str]:
+    """추출 필드 + 런타임 추정 → 출력 행"""
+    # ★ 런타임 자동 추정(후처리: 항상 ON, 라벨 값 있으면 그대로 유지)
+    fields["runtime"] = maybe_infer_runtime(
+        fields["start_time"], fields["runtime"],
+        min_ok=guard_min, max_ok=guard_max
+    )
+
+    return {
+        "title": it["title"],
+        "dow": fields["dow"],
+        "start_time": fields["start_time"],  # 예: '22:30~00:00' 또는 '21:30'
+        "runtime": fields["runtime"],        # 예: '70분' (없으면 빈 문자열)
+    }
+
+# ---------------- 저장 ----------------
+def write_feather_sidecar(columns: Dict[str, List[str]], csv_path: str) -> None:
+    """episode.py가 인코딩 판별 없이 바로 읽도록 CSV 옆에 Feather 사본 저장 (pyarrow 없으면 CSV만 유지)"""
+    if feather is None:
+        print("[skip] feather 저장 생략: pyarrow 미설치")
+        return
+    out = str(Path(csv_path).with_suffix(".feather"))
+    feather.write_feather(pa.table(columns), out, compression="uncompressed")
+    print(f"[✓] feather 저장: {out}")
+
+def save_rows(rows: List[Dict[str, str]], out: str = "drama_weekly.csv") -> None:
+    # 제목 기준 중복 제거(처음 나온 행 유지) 후 표준 csv로 바로 기록
+    seen = set()
+    uniq = [r for r in rows if r["title"] not in seen and not seen.add(r["title"])]
+    fieldnames = ["title", "dow", "start_time", "runtime"]
+
+    with open(out, "w", newline="", encoding="utf-8-sig") as f:
+        w = csv.DictWriter(f, fieldnames=fieldnames)
+        w.writeheader()
+        w.writerows(uniq)
+    print(f"[✓] 저장 완료: {out} (행 수: {len(uniq)})")
+    write_feather_sidecar({k: [r[k] for r in uniq] for k in fieldnames}, out)
+
 # ---------------- 메인 ----------------
 def main():
     parser = argparse.ArgumentParser()
     # NOTE: 옵션은 남겨두되, 실제 동작은 항상 추정 ON (원하면 끄기 위해 플래그 사용 가능)
     parser.add_argument("--guard-min", type=int, default=40, help="추정 허용 최소 분(기본 40)")
     parser.add_argument("--guard-max", type=int, default=120, help="추정 허용 최대 분(기본 120)")
+    parser.add_argument("--no-cache", action="store_true", help="응답 캐시를 쓰지 않고 모두 새로 요청")
     args = parser.parse_args()
 
+    session = make_session(use_cache=not args.no_cache)  # 목록/상세 요청 모두 같은 연결 풀 재사용
     print("[*] 목록 페이지:", LIST_URL)
-    items = extract_list_items(LIST_URL)
+    items = extract_list_items(session, LIST_URL)
     print(f" - 대상 작품 수: {len(items)}")
 
-    rows = []
-    for i, it in enumerate(items, 1):
-        title = it["title"]; url = it["detail_url"]
-        print(f"  ({i}/{len(items)}) {title} — detail={'-' if not url else url}")
-        fields = {"dow": "", "start_time": "", "runtime": ""}
-
-        if url:
-            try:
-                soup = get_soup(url)
-                fields = extract_broadcast_fields_from_infobox(soup)
-            except Exception:
-                pass
-            time.sleep(SLEEP)
-
-        # ★ 런타임 자동 추정(후처리: 항상 ON, 라벨 값 있으면 그대로 유지)
-        fields["runtime"] = maybe_infer_runtime(
-            fields["start_time"], fields["runtime"],
-            min_ok=args.guard_min, max_ok=args.guard_max
-        )
-
-        rows.append({
-            "title": title,
-            "dow": fields["dow"],
-            "start_time": fields["start_time"],  # 예: '22:30~00:00' 또는 '21:30'
-            "runtime": fields["runtime"],        # 예: '70분' (없으면 빈 문자열)
-        })
-
-    df = (pd.DataFrame(rows, columns=["title", "dow", "start_time", "runtime"])
-            .drop_duplicates(subset=["title"], keep="first"))
-
-    out = "drama_weekly.csv"
-    df.to_csv(out, index=False, encoding="utf-8-sig")
-    print(f"[✓] 저장 완료: {out} (행 수: {len(df)})")
+    # 상세 페이지 요청은 서로 독립 → 스레드로 병렬 처리 (행 순서는 목록 순서 유지)
+    rows: List[Optional[Dict[str, str]]] = [None] * len(items)
+    with ThreadPoolExecutor(max_workers=WORKERS) as ex:
+        futs = {
+            ex.submit(scrape_one, session, it, args.guard_min, args.guard_max): i
+            for i, it in enumerate(items)
+        }
+        for done, fut in enumerate(as_completed(futs), 1):
+            i = futs[fut]
+            url = items[i]["detail_url"]
+            rows[i] = fut.result()
+            print(f"  ({done}/{len(items)}) {items[i]['title']} — detail={'-' if not url else url}")
+
+    save_rows(rows)
 
 if __name__ == "__main__":
     main()
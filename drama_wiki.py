@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+drama_wiki.py — drama_person + drama_weekly 통합 수집
+목록 페이지는 1번, 상세 페이지는 작품당 1번만 받아서
+배역(drama_person.csv)과 방송시간/런타임(drama_weekly.csv)을 함께 추출.
+
+- 추출 로직은 drama_person / drama_weekly 함수를 그대로 사용
+- 방송시간은 drama_weekly 단독 실행과 같은 경로(API 위키텍스트 우선, 빈 필드만 HTML 인포박스)로 읽되
+  HTML은 이미 받아 둔 상세 페이지를 재사용
+- 상세 페이지는 lxml로 한 번만 파싱해 두 추출에 같이 사용
+
+사용:
+  python drama_wiki.py
+"""
+
+import argparse
+from typing import List, Dict, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
+import lxml.html
+
+import drama_person as dp
+import drama_weekly as dw
+
+EMPTY_FIELDS = {"dow": "", "start_time": "", "runtime": ""}
+
+def fetch(session: requests.Session, url: str) -> bytes:
+    r = session.get(url, timeout=20)
+    r.raise_for_status()
+    return r.content
+
+def scrape_both(session: requests.Session, url: str, title_fallback: str) -> Tuple[List[Dict[str, str]], Dict[str, str]]:
+    """상세 페이지 1번 요청 → (배역 행 목록, 방송시간 필드)"""
+    # 요청뿐 아니라 파싱/추출 오류도 이 페이지만 비우고 넘어감 (한 페이지 때문에 전체 수집이 멈추지 않게)
+    try:
+        content = fetch(session, url)
+        doc = lxml.html.fromstring(content)  # 한 번 파싱한 트리로 두 추출 모두 처리
+        person_rows = dp.extract_person_rows(doc, title_fallback)
+        fields = dw.fetch_broadcast_fields(session, url, doc)
+    except Exception as e:
+        print(f"[error] {url} ({type(e).__name__})")
+        return [], dict(EMPTY_FIELDS)
+    return person_rows, fields
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--guard-min", type=int, default=40, help="런타임 추정 허용 최소 분(기본 40)")
+    ap.add_argument("--guard-max", type=int, default=120, help="런타임 추정 허용 최대 분(기본 120)")
+    ap.add_argument("--no-cache", action="store_true", help="응답 캐시를 쓰지 않고 모두 새로 요청")
+    args = ap.parse_args()
+
+    session = dp.make_session(use_cache=not args.no_cache)
+
+    # 목록 페이지 1번 파싱 → 두 스크립트 기준의 작품 목록을 각각 만듦
+    print("[*] 목록 페이지:", dp.LIST_URL)
+    soup = dp.get_soup(session, dp.LIST_URL, parse_only=dp.WIKITABLE_STRAINER)
+    person_items = dp.parse_list_items(soup)
+    weekly_items = dw.parse_list_items(soup)
+
+    # 상세 URL별 한 번만 요청 (제목 폴백은 drama_person 목록 기준)
+    fallback_by_url: Dict[str, str] = {}
+    for it in person_items:
+        if it["detail_url"]:
+            fallback_by_url.setdefault(it["detail_url"], it["title_fallback"])
+    for it in weekly_items:
+        if it["detail_url"]:
+            fallback_by_url.setdefault(it["detail_url"], it["title"])
+    print(f" - 상세 페이지: {len(fallback_by_url)}개")
+
+    person_rows: List[Dict[str, str]] = []
+    fields_by_url: Dict[str, Dict[str, str]] = {}
+    with ThreadPoolExecutor(max_workers=dp.WORKERS) as ex:
+        futs = {
+            ex.submit(scrape_both, session, url, fallback): url
+            for url, fallback in fallback_by_url.items()
+        }
+        for done, fut in enumerate(as_completed(futs), 1):
+            url = futs[fut]
+            rows, fields = fut.result()
+            person_rows.extend(rows)
+            fields_by_url[url] = fields
+            print(f"  ({done}/{len(futs)}) {url}")
+
+    weekly_rows = []
+    for it in weekly_items:
+        fields: Optional[Dict[str, str]] = fields_by_url.get(it["detail_url"]) if it["detail_url"] else None
+        weekly_rows.append(dw.make_row(it, dict(fields or EMPTY_FIELDS), args.guard_min, args.guard_max))
+
+    if person_rows:
+        dp.save_rows(person_rows)
+    else:
+        print("[-] 배역 추출 결과 없음")
+    dw.save_rows(weekly_rows)
+
+if __name__ == "__main__":
+    main()
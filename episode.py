@@ -2,54 +2,78 @@
 import os
 import re
 import pandas as pd
-import unicodedata as ud
+try:
+    import pyarrow  # noqa: F401
+    READ_KW = {"dtype_backend": "pyarrow"}  # Arrow 문자열 컬럼 → .str 연산이 C 커널로 처리됨
+except ImportError:  # pyarrow 미설치 시 pandas 기본 dtype으로 읽음
+    READ_KW = {}
 
 BASE = r"C:\Users\PC\Desktop\workspace"
 WEEKLY = os.path.join(BASE, "drama_weekly.csv")   # 1번 파일
 EPISODE = os.path.join(BASE, "episode_bild.csv")  # 2번 파일
 OUTPATH = os.path.join(BASE, "episode.csv")       # 최종 결과
 
-def read_csv_any(path):
+# 키/런타임에 쓰는 컬럼은 문자열로 고정 (숫자처럼 보이는 제목도 추론 없이 원문 그대로)
+WEEKLY_DTYPES  = {"title": "string", "runtime": "string"}
+EPISODE_DTYPES = {"drama_title": "string", "runtime_min": "string"}
+
+def read_csv_any(path, usecols=None, dtype=None):
+    # usecols: 필요한 컬럼만 읽을 때 컬럼 이름 목록 (없는 컬럼은 무시 → 필수 컬럼 확인은 호출 쪽에서)
+    keep = (lambda c: c in usecols) if usecols else None
+    # 스크래퍼가 CSV 옆에 남긴 .feather 사본이 CSV보다 새로우면 그걸 읽음 (인코딩 판별 불필요)
+    fpath = os.path.splitext(path)[0] + ".feather"
+    if os.path.exists(fpath) and (not os.path.exists(path) or os.path.getmtime(fpath) >= os.path.getmtime(path)):
+        try:
+            df = pd.read_feather(fpath, **READ_KW).replace("", pd.NA)  # CSV 읽기와 같게 빈 칸은 결측
+            return df[[c for c in df.columns if keep(c)]] if keep else df
+        except ImportError:
+            pass  # pyarrow 없으면 CSV로
     # utf-8 실패 시 cp949(ANSI)로 재시도
     try:
-        return pd.read_csv(path, encoding="utf-8")
+        return pd.read_csv(path, encoding="utf-8", usecols=keep, dtype=dtype, **READ_KW)
     except UnicodeDecodeError:
-        return pd.read_csv(path, encoding="cp949")
+        return pd.read_csv(path, encoding="cp949", usecols=keep, dtype=dtype, **READ_KW)
+
+# 파이썬 \s와 같은 공백 문자 집합을 문자 그대로 나열한 패턴 (컴파일하지 않은 문자열)
+# → Arrow 문자열 컬럼에서는 pandas가 pyarrow.compute 정규식 커널(RE2)로 한 번에 처리
+#   (RE2의 \s는 ASCII 공백만 잡으므로 \s 대신 명시적으로 나열)
+WS_PATTERN    = "[\t\n\x0b\x0c\r\x1c-\x1f \x85\xa0\u1680\u2000-\u200a\u2028\u2029\u202f\u205f\u3000]+"
+DIGITS_RE     = re.compile(r"(\d+)")
+MIN_SUFFIX_RE = re.compile(r"\s*분\s*$")
 
-def nfc_strip(s: str) -> str:
-    # 유니코드 정규화 + 앞뒤 공백 제거 + 내부 연속 공백 1개로
-    s = ud.normalize("NFC", str(s))
-    s = s.strip()
-    s = re.sub(r"\s+", " ", s)
-    return s
+# 아래 정규화는 모두 Series 단위(.str 접근자)로 처리 → 행마다 파이썬 함수 호출 없음
+def nfc_strip(s: pd.Series) -> pd.Series:
+    # 유니코드 정규화 + 내부 연속 공백 1개로 + 앞뒤 공백 제거 (결측은 결측 유지)
+    # 공백을 먼저 ' '로 접어 두면 strip은 어느 구현이든 ' '만 지우면 되므로 결과가 같음
+    return s.astype("string").str.normalize("NFC").str.replace(WS_PATTERN, " ", regex=True).str.strip()
 
-def normalize_title(s: str) -> str:
+def normalize_title(s: pd.Series) -> pd.Series:
     # 비교용 타이틀 정규화(대소문자 유지, 공백 정리만)
     return nfc_strip(s)
 
-def normalize_runtime_to_minutes_label(x) -> str:
+def normalize_runtime_to_minutes_label(s: pd.Series) -> pd.Series:
     """
     입력 예:
       - 70, '70', '70분', '70 분', '70m', '70 min', '70분(예정)' 등
     출력: '70분'
-    숫자를 찾지 못하면 원문에 '분'만 보정해서 반환
+    숫자를 찾지 못하면 원문에 '분'만 보정해서 반환 (결측은 '')
     """
-    if pd.isna(x):
-        return ""
-    s = str(x)
+    s = s.astype("string")
     # 숫자만 추출 (정수 우선)
-    m = re.search(r"(\d+)", s)
-    if m:
-        return f"{int(m.group(1))}분"
+    num = s.str.extract(DIGITS_RE, expand=False)
     # 숫자 없으면 공백 제거 후 '분' 정리
-    s = nfc_strip(s)
-    s = re.sub(r"\s*분\s*$", "", s)  # 끝의 '분'류 제거
-    return (s + "분") if s else ""
+    text = nfc_strip(s).str.replace(MIN_SUFFIX_RE, "", regex=True)  # 끝의 '분'류 제거
+    out = (text + "분").where(text.str.len() > 0, "")
+    # 숫자는 값마다 int()로 변환 (전각 등 유니코드 숫자도 처리, 긴 숫자도 넘침 없음)
+    # → 제목당 한 값뿐인 Series라 행 단위 호출이어도 부담 없음
+    out = out.mask(num.notna(), num.map(lambda d: f"{int(d)}분", na_action="ignore"))
+    return out.fillna("")
 
 def main():
     # 1) 읽기
-    df1 = read_csv_any(WEEKLY)
-    df2 = read_csv_any(EPISODE)
+    # 1번은 제목/런타임 컬럼만, 2번은 결과에 그대로 쓰므로 전체 컬럼
+    df1 = read_csv_any(WEEKLY, usecols=list(WEEKLY_DTYPES), dtype=WEEKLY_DTYPES)
+    df2 = read_csv_any(EPISODE, dtype=EPISODE_DTYPES)
 
     # 2) 필수 컬럼 확인
     needed1 = {"title", "runtime"}
@@ -62,26 +86,24 @@ def main():
         raise SystemExit(f"episode_bild.csv에 필요한 컬럼이 없습니다: {missing2}")
 
     # 3) 정규화 키 생성
-    df1["_key"] = df1["title"].map(normalize_title)
-    df2["_key"] = df2["drama_title"].map(normalize_title)
+    df1["_key"] = normalize_title(df1["title"])
+    df2["_key"] = normalize_title(df2["drama_title"])
 
     # 4) 1번에서 타이틀별 runtime 사전 생성(중복 시 첫 값 우선)
-    runtime_map = (
+    #    (라벨 정규화는 제목 단위로 한 번만 → 회차 행에는 해시 조인으로 붙임)
+    runtime_map = normalize_runtime_to_minutes_label(
         df1.dropna(subset=["_key"])
            .drop_duplicates(subset=["_key"], keep="first")
            .set_index("_key")["runtime"]
-           .to_dict()
     )
 
     # 5) 매칭 여부 파악 및 채우기
     before_filled = df2["runtime_min"].notna().sum()
-    match_mask = df2["_key"].isin(runtime_map.keys())
+    match_mask = df2["_key"].isin(runtime_map.index)
     matched_count = int(match_mask.sum())
 
     # 채우기: 매칭된 행은 1번 runtime으로 덮어씀
-    df2.loc[match_mask, "runtime_min"] = (
-        df2.loc[match_mask, "_key"].map(runtime_map).map(normalize_runtime_to_minutes_label)
-    )
+    df2["runtime_min"] = df2["_key"].map(runtime_map).where(match_mask, df2["runtime_min"])
 
     after_filled = df2["runtime_min"].notna().sum()
 
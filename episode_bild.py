@@ -6,13 +6,30 @@ episode_bild.py — 나무위키 '{제목}(드라마) → /방영 목록'만 크
 - 같은 회차 중복 병합 + '제목 비고 줄거리만 있을 때 30자 규칙' 반영
 """
 
-import os, re, csv, time, shutil, tempfile
+import os, re, csv, time, random, tempfile, threading
 from pathlib import Path
 from urllib.parse import quote, urlparse
+from functools import lru_cache
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 
 import requests
 import pandas as pd
-from bs4 import BeautifulSoup, Tag
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from html_text import get_text
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
+try:
+    import pyarrow as pa
+    from pyarrow import feather, csv as pacsv
+except ImportError:  # pyarrow 미설치 시 Feather 사본 없이 CSV만 저장
+    pa = feather = pacsv = None
 
 BASE = "https://namu.wiki"
 WORKDIR = Path(r"C:/Users/PC/Desktop/workspace")
@@ -21,39 +38,45 @@ OUT_CSV = WORKDIR / "episode_bild.csv"
 
 TIMEOUT = 8
 SLEEP = 0.35
+WORKERS = 8
+CACHE_PATH = "namu_cache.sqlite"  # descriptions.py / drama_images.py와 같은 나무위키 캐시
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
+# 나무위키(단일 호스트)에 동시에 나가는 요청 수 상한
+# (세션 호출은 이 슬롯 안에서만 수행)
+HOST_SLOTS = threading.BoundedSemaphore(WORKERS)
 HEADERS = {
     "User-Agent": ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
                    "AppleWebKit/537.36 (KHTML, like Gecko) "
                    "Chrome/127.0.0.0 Safari/537.36"),
     "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.6",
+    "Connection": "keep-alive",
 }
 ALLOWED_PREFIXES = ("/", "/w/", "/img/", "/i/", "/js/", "/css/", "/_nuxt/")
 SUBPAGE_NAME = "방영 목록"
+OUT_COLS = ["drama_title","episode_no","title","broadcast_at","runtime_min","description"]
 
 # --- text helpers ---
-_CTRL_RE = re.compile(r"[\x00-\x08\x0B\x0C\x0E-\x1F]")
-ZWJ_RE   = re.compile(r"[\u200D\uFE0E\uFE0F]")
-EMOJI_RE = re.compile(r"[\U00010000-\U0010FFFF]")
-
-def strip_ctrl_emoji(s: str) -> str:
-    if not s: return ""
-    s = _CTRL_RE.sub("", str(s))
-    s = ZWJ_RE.sub("", s)
-    s = EMOJI_RE.sub("", s)
-    s = re.sub(r"\s+", " ", s).strip()
-    return s
-
+# 제어문자 + ZWJ/이모지 변형 선택자는 translate 한 번으로 삭제
+# (\x0B \x0C \x1C-\x1F는 공백 문자라 삭제하지 않고 아래 split()에서 공백으로 처리)
+CTRL_TABLE = dict.fromkeys([*range(0x00, 0x09), *range(0x0E, 0x1C), 0x200D, 0xFE0E, 0xFE0F])
+# 각주 [..] 와 BMP 밖 문자(이모지)를 한 번에 제거
+DROP_RE = re.compile(r"\[[^\]]*\]|[\U00010000-\U0010FFFF]")
+QUOTE_RE        = re.compile(r"[《》〈〉「」『』“”‘’\"'`]+")
+DRAMA_SUFFIX_RE = re.compile(r"\s*\(드라마\)\s*$")
+DIGITS_RE       = re.compile(r"(\d+)")
+
+# 표 머리글("회차", "제목", "방영일" …)처럼 같은 셀 문자열이 표마다 반복되므로 결과를 캐시
+@lru_cache(maxsize=8192)
 def clean_text(s: str) -> str:
     if not s: return ""
-    s = re.sub(r"\[[^\]]*\]", "", str(s))
-    s = s.replace("\r\n", "\n").replace("\r", "\n")
-    s = re.sub(r"\s+", " ", s).strip()
-    return strip_ctrl_emoji(s)
+    s = DROP_RE.sub("", str(s).translate(CTRL_TABLE))
+    return " ".join(s.split())  # 줄바꿈/탭 포함 연속 공백 → 한 칸 + strip
 
+@lru_cache(maxsize=4096)
 def norm_title(s: str) -> str:
     t = clean_text(s)
-    t = re.sub(r"[《》〈〉「」『』“”‘’\"'`]+", "", t)
-    t = re.sub(r"\s*\(드라마\)\s*$", "", t)
+    t = QUOTE_RE.sub("", t)
+    t = DRAMA_SUFFIX_RE.sub("", t)
     return t.strip(" .")
 
 def allowed(url: str) -> bool:
@@ -61,36 +84,115 @@ def allowed(url: str) -> bool:
     p = urlparse(url)
     return any((p.path or "").startswith(pref) for pref in ALLOWED_PREFIXES)
 
+def polite_delay(r: requests.Response, *args, **kwargs) -> None:
+    """응답 훅: 실제 네트워크 응답일 때만 SLEEP~2×SLEEP 사이 무작위 대기 (캐시 응답은 바로 진행)"""
+    if not getattr(r, "from_cache", False):
+        time.sleep(random.uniform(SLEEP, SLEEP * 2))  # 고정 간격 대신 무작위 간격으로 요청 시점을 분산
+
+def make_session() -> requests.Session:
+    # 스레드들이 하나의 커넥션 풀(keep-alive)을 같이 씀
+    # 재실행 시 같은 문서는 로컬 SQLite 캐시에서 읽음 (GET/HEAD, 하루 유지)
+    if CachedSession is not None:
+        s = CachedSession(CACHE_PATH, expire_after=CACHE_TTL, allowable_methods=("GET", "HEAD"))
+    else:
+        s = requests.Session()
+    s.headers.update(HEADERS)
+    s.hooks["response"].append(polite_delay)
+    # 429/5xx는 어댑터에서 백오프 재시도, 끝까지 실패하면 예외 대신 마지막 응답(상태 코드)을 그대로 돌려줌
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+    # 동시 요청은 HOST_SLOTS(WORKERS개)로 제한되므로 keep-alive 커넥션도 그만큼만 유지
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=16, pool_maxsize=WORKERS)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+    return s
+
+def head_status(session: requests.Session, url: str):
+    """HEAD로 문서 존재만 확인 (본문 없이 상태 코드만 받음)"""
+    if not allowed(url):
+        return None
+    try:
+        with HOST_SLOTS:
+            return session.head(url, headers=HEADERS, timeout=TIMEOUT, allow_redirects=True).status_code
+    except requests.RequestException:
+        return None
+
 def get_html_with_status(session: requests.Session, url: str):
     if not allowed(url):
         return None, None
     try:
-        r = session.get(url, headers=HEADERS, timeout=TIMEOUT)
+        with HOST_SLOTS:
+            r = session.get(url, headers=HEADERS, timeout=TIMEOUT)
         return (r.text if r.status_code == 200 else None), r.status_code
     except requests.RequestException:
         return None, None
 
-def atomic_write_csv(df: pd.DataFrame, out_path: Path):
+def base_exists(session: requests.Session, url: str):
+    """후보 본 문서 존재 확인 → (있음 여부, 상태 코드)
+    HEAD 200이면 바로 확정, 확실히 없으면(404/410) 건너뜀,
+    그 외(HEAD를 403/405로 거부하거나 요청 실패)는 drama_images.head_missing처럼 GET으로 다시 확인"""
+    status = head_status(session, url)
+    if status == 200: return True, status
+    if status in (404, 410): return False, status
+    html, status = get_html_with_status(session, url)
+    return html is not None, status
+
+@contextmanager
+def atomic_csv_writer(out_path: Path, header: list[str]):
+    """임시 파일에 행을 나오는 대로 바로 기록하고, 끝까지 성공했을 때만 out_path로 교체"""
     out_path.parent.mkdir(parents=True, exist_ok=True)
-    with tempfile.NamedTemporaryFile("w", delete=False, encoding="utf-8-sig", newline="") as tmp:
-        tmp_name = tmp.name
-        df.to_csv(tmp, index=False, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
-    if out_path.exists():
-        os.remove(out_path)
-    shutil.move(tmp_name, out_path)
+    # 임시 파일은 out_path와 같은 폴더에 만들어 os.replace 한 번으로 교체 (기존 파일이 비는 순간 없음)
+    tmp = tempfile.NamedTemporaryFile("w", dir=out_path.parent, prefix=f".{out_path.name}.", suffix=".tmp",
+                                      delete=False, encoding="utf-8-sig", newline="")
+    try:
+        with tmp:
+            w = csv.writer(tmp, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+            w.writerow(header)
+            yield w
+        os.replace(tmp.name, out_path)
+    finally:
+        if os.path.exists(tmp.name):  # 중간에 실패하면 임시 파일을 남기지 않음
+            os.remove(tmp.name)
+
+def write_feather_sidecar(csv_path: Path):
+    """episode.py가 인코딩 판별 없이 바로 읽도록 CSV 옆에 Feather 사본 저장 (pyarrow 없으면 CSV만 유지)"""
+    if feather is None:
+        print("[skip] feather 저장 생략: pyarrow 미설치")
+        return
+    out = csv_path.with_suffix(".feather")
+    # 행은 메모리에 모아두지 않으므로 방금 쓴 CSV를 Arrow로 다시 읽어 변환 (모든 열은 문자열 그대로)
+    table = pacsv.read_csv(csv_path, convert_options=pacsv.ConvertOptions(
+        column_types=dict.fromkeys(OUT_COLS, pa.string())))
+    feather.write_feather(table, out, compression="uncompressed")
+    print(f"[✓] feather 저장: {out}")
 
 # --- table parsing ---
-def _text(elem: Tag | None) -> str:
-    return clean_text(elem.get_text(separator=" ")) if elem else ""
+# lxml XPath (모듈 로드 시 한 번만 컴파일, 순회는 C 레벨에서 처리)
+TABLES_XPATH = etree.XPath("//table")
+ROWS_XPATH   = etree.XPath(".//tr")
+CELLS_XPATH  = etree.XPath(".//th|.//td")
 
-def normalize_episode_no(s: str) -> str:
-    m = re.search(r"(\d+)", clean_text(s))
-    return f"{int(m.group(1))}화" if m else clean_text(s)
+def _text(elem: HtmlElement | None) -> str:
+    # 보이는 텍스트 노드만 공백으로 이어 붙임 (셀 안 인라인 <style>/<script> 내용은 제외)
+    if elem is None: return ""
+    return clean_text(get_text(elem, " "))
 
-def parse_table_horizontal(table: Tag) -> list[dict]:
-    rows = table.find_all("tr")
-    if not rows: return []
-    header = rows[0].find_all(["th", "td"])
+def _strong_or_self(elem: HtmlElement) -> HtmlElement:
+    strong = elem.find(".//strong")
+    return strong if strong is not None else elem
+
+@lru_cache(maxsize=4096)
+def normalize_episode_no(s: str) -> str:
+    s = clean_text(s)
+    m = DIGITS_RE.search(s)
+    return f"{int(m.group(1))}화" if m else s
+
+# 아래 3개 파서는 행별 셀 목록(tr마다 CELLS_XPATH 결과, 문서 순서)을 받음
+# → 표당 tr/셀 조회는 parse_episode_table에서 한 번만 하고, th/td 구분은 태그로 거름
+def _tds(cells: list[HtmlElement]) -> list[HtmlElement]:
+    return [c for c in cells if c.tag == "td"]
+
+def parse_table_horizontal(cells_by_row: list[list[HtmlElement]]) -> list[dict]:
+    if not cells_by_row: return []
+    header = cells_by_row[0]
     if not header: return []
 
     def keyname(x: str) -> str:
@@ -110,40 +212,44 @@ def parse_table_horizontal(table: Tag) -> list[dict]:
     if "episode_no" not in keys or not (("title" in keys) or ("broadcast_at" in keys)):
         return []
 
+    # 행 루프에서 반복 조회하는 이름은 지역 변수로 묶어 둠
+    # idx_items는 열 번호 오름차순 → 필요한 열만 바로 인덱싱, 셀이 모자라면 중단
+    idx_items = tuple(idx_map.items())
+    text, strong_or_self, ep_no = _text, _strong_or_self, normalize_episode_no
+    has_digit = DIGITS_RE.search
+
     out: list[dict] = []
-    for tr in rows[1:]:
-        cells = tr.find_all(["td", "th"])
+    for cells in cells_by_row[1:]:
         if not cells: continue
+        n = len(cells)
         item = {"episode_no":"", "title":"", "broadcast_at":"", "runtime_min":"", "description":""}
-        for i, td in enumerate(cells):
-            if i not in idx_map: continue
-            key = idx_map[i]
-            val = _text(td)
-            if key == "episode_no":
-                val = normalize_episode_no(val)
+        for i, key in idx_items:
+            if i >= n: break
+            td = cells[i]
             if key == "title":
-                strong = td.find("strong")
-                if strong: val = _text(strong)
-            item[key] = val
+                item[key] = text(strong_or_self(td))
+            elif key == "episode_no":
+                item[key] = ep_no(text(td))
+            else:
+                item[key] = text(td)
         # 숫자 회차만
-        if not re.search(r"\d+", item["episode_no"] or ""):
+        if not has_digit(item["episode_no"]):
             continue
         out.append(item)
     return out
 
-def parse_table_vertical(table: Tag) -> list[dict]:
-    rows = table.find_all("tr")
-    if not rows: return []
+def parse_table_vertical(cells_by_row: list[list[HtmlElement]]) -> list[dict]:
+    if not cells_by_row: return []
     label = {}
-    for tr in rows:
-        th = tr.find("th")
-        tds = tr.find_all("td")
-        if th and tds:
+    for cells in cells_by_row:
+        th = next((c for c in cells if c.tag == "th"), None)
+        tds = _tds(cells)
+        if th is not None and tds:
             label[_text(th).replace(" ","")] = _text(tds[-1])
     hit = sum(1 for k in label if any(x in k for x in ("회차","방영일","제목","줄거리")))
     if hit < 2: return []
     ep = normalize_episode_no(label.get("회차",""))
-    if not re.search(r"\d+", ep or ""): return []
+    if not DIGITS_RE.search(ep or ""): return []
     return [{
         "episode_no": ep,
         "title": label.get("제목",""),
@@ -152,23 +258,23 @@ def parse_table_vertical(table: Tag) -> list[dict]:
         "description": label.get("줄거리",""),
     }]
 
-def parse_table_backup_indexed(table: Tag) -> list[dict]:
-    rows = table.find_all("tr")
-    if not rows: return []
+def parse_table_backup_indexed(cells_by_row: list[list[HtmlElement]]) -> list[dict]:
+    if not cells_by_row: return []
+    rows = cells_by_row
     try:
-        td0 = rows[0].find("td")
-        ep_text = _text(td0.find("strong") or td0) if td0 else ""
+        td0 = next((c for c in rows[0] if c.tag == "td"), None)
+        ep_text = _text(_strong_or_self(td0)) if td0 is not None else ""
         ep = normalize_episode_no(ep_text)
-        if not re.search(r"\d+", ep or ""): return []
+        if not DIGITS_RE.search(ep or ""): return []
         broadcast_at = title = description = ""
         if len(rows) >= 3:
-            tds = rows[2].find_all("td")
+            tds = _tds(rows[2])
             if len(tds) >= 2: broadcast_at = _text(tds[1])
         if len(rows) >= 4:
-            tds = rows[3].find_all("td")
-            if len(tds) >= 2: title = _text(tds[1].find("strong") or tds[1])
+            tds = _tds(rows[3])
+            if len(tds) >= 2: title = _text(_strong_or_self(tds[1]))
         if len(rows) >= 5:
-            tds = rows[4].find_all("td")
+            tds = _tds(rows[4])
             if len(tds) >= 2: description = _text(tds[1])
         return [{
             "episode_no": ep,
@@ -180,22 +286,27 @@ def parse_table_backup_indexed(table: Tag) -> list[dict]:
     except Exception:
         return []
 
-def parse_episode_table(tbl: Tag) -> list[dict]:
-    out = parse_table_horizontal(tbl)
+def parse_episode_table(tbl: HtmlElement) -> list[dict]:
+    # 가로형 파서가 모든 행의 셀을 쓰므로 미리 한 번에 모아 세 파서가 같이 사용
+    cells_by_row = [CELLS_XPATH(tr) for tr in ROWS_XPATH(tbl)]
+    if not cells_by_row: return []
+    out = parse_table_horizontal(cells_by_row)
     if out: return out
-    out = parse_table_vertical(tbl)
+    out = parse_table_vertical(cells_by_row)
     if out: return out
-    return parse_table_backup_indexed(tbl)
+    return parse_table_backup_indexed(cells_by_row)
+
+def ep_key(d: dict, _search=DIGITS_RE.search) -> int:
+    # 회차 숫자 기준 정렬 키 (숫자 없으면 맨 뒤)
+    m = _search(d.get("episode_no","") or "")
+    return int(m.group(1)) if m else 10**9
 
 def parse_document(html: str) -> list[dict]:
-    soup = BeautifulSoup(html, "html.parser")
+    doc = lxml.html.fromstring(html)
     rows: list[dict] = []
-    for tbl in soup.find_all("table"):
+    for tbl in TABLES_XPATH(doc):
         rows.extend(parse_episode_table(tbl))
     # 정렬
-    def ep_key(d):
-        m = re.search(r"(\d+)", d.get("episode_no","") or "")
-        return int(m.group(1)) if m else 10**9
     rows.sort(key=ep_key)
     return rows
 
@@ -204,15 +315,16 @@ def fetch_episodes_for_title(session: requests.Session, title_display: str) -> l
     base = norm_title(title_display)
     title_cands = (f"{base} (드라마)", f"{base}(드라마)", base)
 
+    # 후보 순서대로 확인하고 처음 있는 문서에서 멈춤 (대부분 첫 후보에서 끝나므로 나머지 요청/대기 없음)
+    # (본 문서 HTML은 쓰지 않으므로 HEAD가 통하면 GET은 방영 목록 하위 문서 1번만)
     base_url = None
     for cand in title_cands:
         url = f"{BASE}/w/{quote(cand, safe='')}"
-        html, status = get_html_with_status(session, url)
+        ok, status = base_exists(session, url)
         print(f"    - base check: {url} [{status}]")
-        if html:
+        if ok:
             base_url = url
             break
-        time.sleep(SLEEP)
     if not base_url:
         return []
 
@@ -271,12 +383,14 @@ def collapse_episodes(eps: list[dict]) -> list[dict]:
         })
 
     # 회차 순서 정렬
-    def ep_key(d):
-        m = re.search(r"(\d+)", d.get("episode_no","") or "")
-        return int(m.group(1)) if m else 10**9
     out.sort(key=ep_key)
     return out
 
+def crawl_title(session: requests.Session, title_display: str) -> list[dict]:
+    """워커 단위: 제목 1개 처리 (요청 간격은 세션의 polite_delay 훅이 담당)"""
+    eps = fetch_episodes_for_title(session, title_display)
+    return collapse_episodes(eps) if eps else []  # 중복 병합 + 30자 규칙
+
 # --- main ---
 def main():
     try:
@@ -290,27 +404,24 @@ def main():
         return
 
     titles = [str(x).strip() for x in df[title_col].fillna("") if str(x).strip()]
-    out_rows = []
-
-    with requests.Session() as session:
-        for i, t in enumerate(titles, 1):
+    total = 0
+
+    # 제목별 크롤링은 서로 독립 → WORKERS개 스레드로 네트워크 대기를 겹침 (결과 순서는 입력 순서 유지)
+    # 회차 행은 메모리에 모으지 않고 제목별로 바로 CSV에 기록
+    with atomic_csv_writer(OUT_CSV, OUT_COLS) as w, \
+         make_session() as session, ThreadPoolExecutor(max_workers=WORKERS) as ex:
+        results = ex.map(lambda t: crawl_title(session, t), titles)
+        for i, (t, eps) in enumerate(zip(titles, results), 1):
             print(f"[{i}/{len(titles)}] {t}")
-            eps = fetch_episodes_for_title(session, t)
             if not eps:
                 print("  - (no episode list)")
                 continue
-            eps = collapse_episodes(eps)  # 중복 병합 + 30자 규칙
-            for ep in eps:
-                out_rows.append({
-                    "drama_title": t,
-                    **ep,  # episode_no, title, broadcast_at, runtime_min, description
-                })
-            time.sleep(SLEEP)
-
-    cols = ["drama_title","episode_no","title","broadcast_at","runtime_min","description"]
-    df_out = pd.DataFrame(out_rows, columns=cols) if out_rows else pd.DataFrame(columns=cols)
-    atomic_write_csv(df_out, OUT_CSV)
-    print(f"[✓] 저장 완료: {OUT_CSV} (총 {len(df_out)}행)")
+            # episode_no, title, broadcast_at, runtime_min, description
+            w.writerows([t, *(ep[c] for c in OUT_COLS[1:])] for ep in eps)
+            total += len(eps)
+
+    print(f"[✓] 저장 완료: {OUT_CSV} (총 {total}행)")
+    write_feather_sidecar(OUT_CSV)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,21 @@
+# -*- coding: utf-8 -*-
+"""
+lxml 요소에서 화면에 보이는 텍스트만 꺼내는 공용 함수
+(bs4 get_text()와 같은 문자열만: 주석, script/style/template/rt/rp 안의 텍스트 제외)
+"""
+
+from lxml import etree
+from lxml.html import HtmlElement
+
+SKIP_TAGS = ("script", "style", "template", "rt", "rp")
+STRINGS_XPATH = etree.XPath(
+    ".//text()[not(ancestor::script or ancestor::style or ancestor::template"
+    " or ancestor::rt or ancestor::rp)]",
+    smart_strings=False,
+)
+
+def get_text(el: HtmlElement, sep: str = "") -> str:
+    """bs4 el.get_text(sep)와 같은 용도 — 인라인 <style>/<script>의 CSS/JS가 값에 섞이지 않음"""
+    if len(el) == 0 and el.tag not in SKIP_TAGS:  # 자식 없는 셀/라벨은 .text가 곧 전체 텍스트 → XPath 생략
+        return el.text or ""
+    return sep.join(STRINGS_XPATH(el))
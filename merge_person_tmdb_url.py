@@ -24,23 +24,19 @@ df_tmdb["name"] = df_tmdb["name"].astype(str).str.strip()
 # TMDB에서 가져온 url 컬럼 이름 통일(profile_url → url)
 df_tmdb = df_tmdb.rename(columns={"profile_url": "url"})
 
-# name 기준 left join (기존 데이터 유지)
-merged = pd.merge(
-    df_orig,
-    df_tmdb[["name", "url"]],   # 필요한 컬럼만 join
-    on="name",
-    how="left",
-    suffixes=("", "_tmdb")
-)
+# name → url 조회표 (같은 이름이 여러 번 있으면 첫 값 우선)
+tmdb_url = df_tmdb.drop_duplicates(subset=["name"], keep="first").set_index("name")["url"]
+
+# name 기준으로 url만 붙임 (merge 없이 해시 조회 → 기존 행/컬럼 순서 그대로 유지)
+new_url = df_orig["name"].map(tmdb_url)
 
 # 기존 url 컬럼이 있다면 → tmdb url이 있으면 덮어쓰기
 if "url" in df_orig.columns:
-    merged["url"] = merged["url_tmdb"].combine_first(merged["url"])
-    merged = merged.drop(columns=["url_tmdb"])
+    df_orig["url"] = new_url.combine_first(df_orig["url"])
 else:
-    merged = merged.rename(columns={"url_tmdb": "url"})
+    df_orig["url"] = new_url
 
 # 저장
-merged.to_csv(out_file, index=False, encoding="utf-8-sig")
+df_orig.to_csv(out_file, index=False, encoding="utf-8-sig")
 
 print(f"[완료] 저장됨: {out_file}")
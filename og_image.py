@@ -0,0 +1,32 @@
+# -*- coding: utf-8 -*-
+"""
+나무위키 문서 HTML에서 og:image(대표 이미지) 값을 꺼내는 공용 함수
+(drama_images.py / person_image.py에서 같이 사용)
+"""
+
+import re
+from html import unescape
+import lxml.html
+from lxml import etree
+
+OG_IMAGE_XPATH = etree.XPath('//meta[@property="og:image"]/@content')
+# og:image 메타 태그 직접 매칭 (property/content 순서 양쪽 모두)
+# content 값은 감싼 따옴표 종류별로 따로 잡음 → "it's.jpg"처럼 값 안의 다른 따옴표에서 끊기지 않음
+OG_META_RE     = re.compile(r"""<meta\s[^>]*?property\s*=\s*["']og:image["'][^>]*?content\s*=\s*(?:"([^"]*)"|'([^']*)')""", re.I)
+OG_META_REV_RE = re.compile(r"""<meta\s[^>]*?content\s*=\s*(?:"([^"]*)"|'([^']*)')[^>]*?property\s*=\s*["']og:image["']""", re.I)
+
+def head_part(html: str) -> str:
+    """og:image 메타 태그는 <head> 안에만 있음 → 본문은 파싱하지 않도록 </head>까지만 자름"""
+    i = html.find("</head>")
+    return html[:i + len("</head>")] if i != -1 else html
+
+def og_image_content(html: str) -> str | None:
+    """정규식으로 meta 태그만 바로 찾고, 못 찾을 때만 <head>를 파싱 (없거나 빈 문서면 None)"""
+    if not html or html.isspace(): return None
+    m = OG_META_RE.search(html) or OG_META_REV_RE.search(html)
+    if m: return unescape(m.group(m.lastindex))  # 두 따옴표 그룹 중 실제로 잡힌 쪽
+    try:
+        contents = OG_IMAGE_XPATH(lxml.html.fromstring(head_part(html)))
+    except etree.ParserError:  # 주석만 있는 본문 등 파싱할 요소가 없는 문서
+        return None
+    return contents[0] if contents else None
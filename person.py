@@ -8,15 +8,24 @@ name, birth_date, gender 추출.
 
 import re
 import time
+import threading
 from typing import List, Dict, Optional, Tuple
 from urllib.parse import urljoin
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 
 import pandas as pd
 import requests
-from bs4 import BeautifulSoup, Tag, NavigableString
+import lxml.html
+from lxml import etree
+from lxml.html import HtmlElement
+from bs4 import BeautifulSoup, SoupStrainer, Tag, NavigableString
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
+from html_text import get_text
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
 
 # ================= 기본 설정 =================
 BASE = "https://ko.wikipedia.org"
@@ -30,8 +39,10 @@ HEADERS = {
     "Connection": "keep-alive",
 }
 
-SLEEP = 0.15
 WORKERS = 8
+SLEEP = 0.15  # 모든 워커 합쳐 실제 요청 사이 최소 간격(초)
+CACHE_NAME = "drama_wiki_cache"  # → drama_wiki_cache.sqlite (drama_person / drama_weekly와 같은 캐시)
+CACHE_TTL  = 86400  # 응답 캐시 유지 시간(초)
 
 # ======= 섹션 키워드 =======
 ALLOW_SECTIONS = [
@@ -65,20 +76,46 @@ NON_PERSON_BRANDS = (
     "아누팜 트리파티", "덱스터 스튜디오", "미스터 로맨스"
 )
 
+# 키워드 묶음별 한 번의 정규식 검색으로 포함 여부 판정 (any(w in t ...) 반복 대신)
+def _words_re(words) -> re.Pattern:
+    return re.compile("|".join(map(re.escape, words)))
+
+ALLOW_SECTION_RE = _words_re(ALLOW_SECTIONS)
+BLOCK_SECTION_RE = _words_re(BLOCK_SECTIONS)
+NON_PERSON_HINT_RE  = _words_re(NON_PERSON_HINTS)
+NON_PERSON_BRAND_RE = _words_re(NON_PERSON_BRANDS)
+
 DATE_RE = re.compile(r"(\d{4}년\s*\d{1,2}월\s*\d{1,2}일)")  # 1982년 11월 5일
 
+# 셀/링크마다 호출되는 정규식은 모듈 로드 시 한 번만 컴파일
+FOOTNOTE_RE   = re.compile(r"\[[^\]]*\]")
+HANGUL_DOT_RE = re.compile(r"[가-힣·]+")
+
+# 링크/행마다 부르는 매칭 메서드는 미리 바인딩 (호출 때마다 속성 조회 생략)
+_kr_name_match   = KOREAN_NAME_RE.match
+_hangul_dot_full = HANGUL_DOT_RE.fullmatch
+_date_search     = DATE_RE.search
+
 # ================= 유틸 =================
 def clean_text(s: str) -> str:
     if not s:
         return ""
-    s = re.sub(r"\[[^\]]*\]", "", s)  # 각주 제거
-    s = re.sub(r"\s+", " ", s)
-    return s.strip()
+    # 각주 제거 후 split/join으로 공백 정리 + 양끝 strip을 한 번에 (공백 정규식 없음)
+    return " ".join(FOOTNOTE_RE.sub("", s).split())
 
 def looks_like_person_name(txt: str) -> bool:
-    if KOREAN_NAME_RE.match(txt):
+    # 정규식 전에 길이/첫 글자로 먼저 거름 (링크 대부분은 여기서 탈락)
+    # - 두 패턴 모두 2글자 이상, 최대 '4+공백+4'자 (+ $가 허용하는 끝 개행 1자)
+    # - 첫 글자는 한글 음절 또는 '·'(두 번째 패턴)
+    n = len(txt)
+    if n < 2 or n > 10:
+        return False
+    c = txt[0]
+    if not ("가" <= c <= "힣" or c == "·"):
+        return False
+    if _kr_name_match(txt):
         return True
-    if 2 <= len(txt) <= 5 and re.fullmatch(r"[가-힣·]+", txt):
+    if 2 <= len(txt) <= 5 and _hangul_dot_full(txt):
         return True
     return False
 
@@ -91,15 +128,16 @@ def is_actor_link(a: Tag) -> bool:
     tail = href.split("/wiki/")[-1]
     if ":" in tail:  # 파일/분류/틀 등 제외
         return False
+    # href만으로 거를 수 있는 건 링크 텍스트를 꺼내기 전에 먼저 확인
+    if NON_PERSON_BRAND_RE.search(tail):
+        return False
 
     txt: str = clean_text(a.get_text())
     if not txt:
         return False
-    if any(b in txt for b in NON_PERSON_BRANDS):
-        return False
-    if any(b in tail for b in NON_PERSON_BRANDS):
+    if NON_PERSON_BRAND_RE.search(txt):
         return False
-    if any(h in txt for h in NON_PERSON_HINTS):
+    if NON_PERSON_HINT_RE.search(txt):
         return False
 
     base = txt.split("(")[0].strip()
@@ -131,18 +169,51 @@ def pick_actor_anchor(container: Tag) -> Optional[Tag]:
     return first_a if actor_count == 1 else None
 
 # ================= 세션/요청 =================
-def make_session() -> requests.Session:
-    s = requests.Session()
+_RATE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+def wait_turn() -> None:
+    """모든 워커 합쳐 요청 사이 최소 SLEEP 간격 보장: 잠금 안에서 다음 허용 시각만 예약, 대기는 잠금 밖에서"""
+    global _next_request_at
+    with _RATE_LOCK:
+        now = time.monotonic()
+        at = max(now, _next_request_at)
+        _next_request_at = at + SLEEP
+    if at > now:
+        time.sleep(at - now)
+
+def polite_delay(r: requests.Response, *args, **kwargs) -> None:
+    """응답 훅: 실제 네트워크 응답일 때만 다음 요청 차례를 기다림 (캐시 응답은 바로 진행)"""
+    if not getattr(r, "from_cache", False):
+        wait_turn()
+
+def make_session(use_cache: bool = True) -> requests.Session:
+    # 재실행 시 이미 받은 문서(목록/작품/배우)는 로컬 SQLite 캐시에서 읽음 (GET, 하루 유지)
+    if use_cache and CachedSession is not None:
+        s = CachedSession(CACHE_NAME, expire_after=CACHE_TTL, allowable_methods=("GET",))
+    else:
+        s = requests.Session()
     s.headers.update(HEADERS)
+    # 작품/배우 문서를 여러 스레드가 같은 호스트에 요청 → 워커 전체 공용 limiter로 간격 조절 (캐시 적중 시 대기 없음)
+    s.hooks["response"].append(polite_delay)
     retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504])
     adapter = HTTPAdapter(max_retries=retry, pool_connections=64, pool_maxsize=64)
     s.mount("https://", adapter); s.mount("http://", adapter)
     return s
 
-def get_soup(session: requests.Session, url: str) -> BeautifulSoup:
+# 작품 상세 페이지는 제목(h1)과 본문(#mw-content-text)만 파싱 (내비/사이드바/푸터/스크립트는 객체로 만들지 않음)
+DETAIL_STRAINER = SoupStrainer(id=["firstHeading", "mw-content-text"])
+
+def get_soup(session: requests.Session, url: str, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    r = session.get(url, timeout=20)
+    r.raise_for_status()
+    return BeautifulSoup(r.content, "lxml", parse_only=parse_only)  # 바이트 그대로 넘겨 파서가 meta charset으로 디코딩
+
+def get_doc(session: requests.Session, url: str) -> HtmlElement:
+    # 배우 문서처럼 인포박스/분류만 보는 페이지는 bs4 트리 없이 lxml로 바로 파싱
     r = session.get(url, timeout=20)
     r.raise_for_status()
-    return BeautifulSoup(r.text, "lxml")
+    return lxml.html.fromstring(r.content)
 
 # ================= 목록 페이지 =================
 def extract_list_items(session: requests.Session, list_url: str) -> List[Dict]:
@@ -206,28 +277,61 @@ def _skip_block(tag: Tag) -> bool:
         return True
     return False
 
-def _nearest_prev_heading_text(root: Tag, node: Tag) -> str:
-    cur = node
-    while cur is not None and cur is not root:
-        prev = cur.previous_sibling
-        while prev:
-            if isinstance(prev, Tag) and prev.name in ("h2", "h3", "h4"):
-                return clean_text(prev.get_text())
-            prev = prev.previous_sibling
-        cur = cur.parent
-    return ""
-
-def _in_allowed_section(root: Tag, node: Tag) -> bool:
-    sec_title = _nearest_prev_heading_text(root, node)
+def _heading_finder(root: Tag):
+    """
+    본문(root)별 '가장 가까운 앞쪽 h2/h3/h4 제목' 조회 함수 생성 (drama_person._heading_finder의 bs4판).
+    - 부모마다 자식 목록을 한 번만 훑어 자식별 직전 제목을 기록
+    - 노드 → 조상 방향으로 올라가며 처음 만난 단계의 제목 사용 (root 바깥은 보지 않음)
+    - 한 번 구한 노드/조상의 결과는 캐시 → ul/table/dl마다 형제를 다시 거슬러 올라가지 않음
+    bs4 Tag의 ==는 내용 비교라서 사전 키는 id(tag) 사용
+    """
+    by_parent: Dict[int, Dict[int, Optional[str]]] = {}
+    resolved: Dict[int, str] = {}
+
+    def level_index(parent: Tag) -> Dict[int, Optional[str]]:
+        idx = by_parent.get(id(parent))
+        if idx is None:
+            idx, cur = {}, None
+            for ch in parent.children:
+                if isinstance(ch, Tag):
+                    idx[id(ch)] = cur
+                    if ch.name in ("h2", "h3", "h4"):
+                        cur = clean_text(ch.get_text())
+            by_parent[id(parent)] = idx
+        return idx
+
+    def nearest(node: Tag) -> str:
+        chain, sec = [], ""
+        cur = node
+        while cur is not None and cur is not root:
+            key = id(cur)
+            if key in resolved:
+                sec = resolved[key]; break
+            chain.append(key)
+            parent = cur.parent
+            if parent is None:
+                break
+            h = level_index(parent)[key]
+            if h is not None:
+                sec = h; break
+            cur = parent
+        for key in chain:
+            resolved[key] = sec
+        return sec
+
+    return nearest
+
+def _in_allowed_section(nearest, node: Tag) -> bool:
+    sec_title = nearest(node)
     if not sec_title:
         return False
     s = sec_title.split("[", 1)[0].split(":", 1)[0]
-    if any(b in s for b in BLOCK_SECTIONS):
+    if BLOCK_SECTION_RE.search(s):
         return False
-    return any(a in s for a in ALLOW_SECTIONS)
+    return ALLOW_SECTION_RE.search(s) is not None
 
 # ================= 수집: 배우 링크(이름+URL) =================
-def collect_actor_links_from_uls(root: Tag, page_title: str) -> List[Tuple[str, str]]:
+def collect_actor_links_from_uls(root: Tag, page_title: str, nearest) -> List[Tuple[str, str]]:
     out: List[Tuple[str, str]] = []
     for ul in root.find_all("ul"):
         anc, skip = ul, False
@@ -235,7 +339,7 @@ def collect_actor_links_from_uls(root: Tag, page_title: str) -> List[Tuple[str,
             if _skip_block(anc):
                 skip = True; break
             anc = anc.parent
-        if skip or not _in_allowed_section(root, ul):
+        if skip or not _in_allowed_section(nearest, ul):
             continue
         for li in ul.find_all("li", recursive=False):
             a = pick_actor_anchor(li)
@@ -246,7 +350,7 @@ def collect_actor_links_from_uls(root: Tag, page_title: str) -> List[Tuple[str,
                 out.append((txt, urljoin(BASE, a["href"])))
     return out
 
-def collect_actor_links_from_tables(root: Tag, page_title: str) -> List[Tuple[str, str]]:
+def collect_actor_links_from_tables(root: Tag, page_title: str, nearest) -> List[Tuple[str, str]]:
     out: List[Tuple[str, str]] = []
     for table in root.find_all(["table"]):
         anc, skip = table, False
@@ -254,7 +358,7 @@ def collect_actor_links_from_tables(root: Tag, page_title: str) -> List[Tuple[st
             if _skip_block(anc):
                 skip = True; break
             anc = anc.parent
-        if skip or not _in_allowed_section(root, table):
+        if skip or not _in_allowed_section(nearest, table):
             continue
         for cell in table.find_all(["td", "th"]):
             a = pick_actor_anchor(cell)
@@ -265,7 +369,7 @@ def collect_actor_links_from_tables(root: Tag, page_title: str) -> List[Tuple[st
                 out.append((txt, urljoin(BASE, a["href"])))
     return out
 
-def collect_actor_links_from_definition_lists(root: Tag, page_title: str) -> List[Tuple[str, str]]:
+def collect_actor_links_from_definition_lists(root: Tag, page_title: str, nearest) -> List[Tuple[str, str]]:
     out: List[Tuple[str, str]] = []
     for dl in root.find_all("dl"):
         anc, skip = dl, False
@@ -273,7 +377,7 @@ def collect_actor_links_from_definition_lists(root: Tag, page_title: str) -> Lis
             if _skip_block(anc):
                 skip = True; break
             anc = anc.parent
-        if skip or not _in_allowed_section(root, dl):
+        if skip or not _in_allowed_section(nearest, dl):
             continue
         for node in dl.find_all(["dt", "dd"], recursive=False):
             a = pick_actor_anchor(node)
@@ -291,10 +395,11 @@ def extract_actor_links_scoped(soup: BeautifulSoup) -> Tuple[List[Tuple[str, str
     root = soup.select_one("#mw-content-text > div.mw-content-ltr.mw-parser-output")
     if not root:
         return [], stats
+    nearest = _heading_finder(root)  # 세 수집 함수가 섹션 제목 조회 결과를 같이 씀
     pairs: List[Tuple[str, str]] = []
-    ul_pairs = collect_actor_links_from_uls(root, page_title);              stats["ul"] = len(ul_pairs)
-    tb_pairs = collect_actor_links_from_tables(root, page_title);            stats["table"] = len(tb_pairs)
-    dl_pairs = collect_actor_links_from_definition_lists(root, page_title);  stats["dl"] = len(dl_pairs)
+    ul_pairs = collect_actor_links_from_uls(root, page_title, nearest);              stats["ul"] = len(ul_pairs)
+    tb_pairs = collect_actor_links_from_tables(root, page_title, nearest);           stats["table"] = len(tb_pairs)
+    dl_pairs = collect_actor_links_from_definition_lists(root, page_title, nearest); stats["dl"] = len(dl_pairs)
     pairs.extend(ul_pairs + tb_pairs + dl_pairs)
 
     # uniq by (name, url)
@@ -314,7 +419,7 @@ def extract_actor_links_scoped(soup: BeautifulSoup) -> Tuple[List[Tuple[str, str
             continue
         if child.name in ("h2", "h3", "h4"):
             title = clean_text(child.get_text())
-            if any(b in title for b in BLOCK_SECTIONS):
+            if BLOCK_SECTION_RE.search(title):
                 break
         if child.name == "ul":
             for li in child.find_all("li", recursive=False):
@@ -336,46 +441,82 @@ def extract_actor_links_scoped(soup: BeautifulSoup) -> Tuple[List[Tuple[str, str
     return uniq_fb, stats
 
 # ================= 배우 개인 문서 파서 =================
-def _infobox(soup: BeautifulSoup) -> Optional[Tag]:
-    return soup.select_one("#mw-content-text table.infobox")
-
-def _infobox_value_by_header(soup: BeautifulSoup, header_keywords: List[str]) -> Optional[str]:
-    box = _infobox(soup)
-    if not box:
-        return None
-    for tr in box.select("tr"):
-        th = tr.find("th")
-        td = tr.find("td")
-        if not th or not td:
-            continue
-        h = clean_text(th.get_text())
+# 배우 문서는 배우 수만큼 받으므로 bs4 대신 lxml 트리 + 미리 컴파일한 XPath로 처리
+# 본문 첫 인포박스의 tr 중 th/td가 모두 있는 행만 한 번에 조회
+INFOBOX_ROWS_XPATH = etree.XPath(
+    '(//*[@id="mw-content-text"]//table[contains(concat(" ", normalize-space(@class), " "), " infobox ")])[1]'
+    '//tr[.//th and .//td]'
+)
+FIRST_TH_XPATH = etree.XPath("(.//th)[1]")
+FIRST_TD_XPATH = etree.XPath("(.//td)[1]")
+CATLINKS_XPATH = etree.XPath('//*[@id="catlinks"]//a')
+def _infobox_rows(doc: HtmlElement) -> List[Tuple[str, HtmlElement]]:
+    """인포박스 (행 제목, 값 td) 목록 — 항목 조회마다 표를 다시 훑지 않도록 한 번만 만듦"""
+    return [(clean_text(get_text(FIRST_TH_XPATH(tr)[0])), FIRST_TD_XPATH(tr)[0])
+            for tr in INFOBOX_ROWS_XPATH(doc)]
+
+def _infobox_value_by_header(rows: List[Tuple[str, HtmlElement]], header_keywords: List[str]) -> Optional[str]:
+    for h, td in rows:
         if any(k in h for k in header_keywords):
-            return clean_text(td.get_text(" ").strip())
+            return clean_text(get_text(td, " ").strip())
     return None
 
+def _num_unit_end(s: str, pos: int, unit: str) -> int:
+    # s[pos:]가 공백* + 숫자 1~2개 + unit 으로 시작하면 unit 다음 위치, 아니면 -1
+    n = len(s)
+    while pos < n and s[pos].isspace():
+        pos += 1
+    k = pos
+    while k < n and k - pos < 2 and s[k].isdecimal():
+        k += 1
+    if k == pos or k >= n or s[k] != unit:
+        return -1
+    return k + 1
+
+def _fast_birth(raw: str) -> Optional[str]:
+    """
+    인포박스 출생 값은 대부분 'YYYY년 M월 D일'로 시작 → 첫 '년' 기준으로 문자열 연산만으로 확인.
+    첫 '년' 앞 4자리가 숫자면 그 위치가 DATE_RE의 가장 왼쪽 매치 후보이므로 결과가 같음.
+    형식이 다르면 None (호출 쪽에서 DATE_RE로 다시 찾음)
+    """
+    i = raw.find("년")
+    if i < 4 or not raw[i - 4:i].isdecimal():
+        return None
+    j = _num_unit_end(raw, i + 1, "월")
+    if j < 0:
+        return None
+    k = _num_unit_end(raw, j, "일")
+    if k < 0:
+        return None
+    return raw[i - 4:k]
+
 def extract_birth_date_and_gender(session: requests.Session, url: str) -> Tuple[Optional[str], Optional[str]]:
     """배우 문서에서 birth_date(YYYY년 M월 D일)와 gender('남성'/'여성' 등) 추출"""
     try:
-        soup = get_soup(session, url)
+        doc = get_doc(session, url)
     except Exception:
         return None, None
 
+    rows = _infobox_rows(doc)
+
     # 1) 생년월일
-    raw_birth = _infobox_value_by_header(soup, ["출생", "생년월일"])
+    raw_birth = _infobox_value_by_header(rows, ["출생", "생년월일"])
     birth_date = None
     if raw_birth:
         # 예) "1982년 11월 5일(42세) 대한민국 서울특별시 ..."
-        m = DATE_RE.search(raw_birth)
-        if m:
-            birth_date = m.group(1)
+        birth_date = _fast_birth(raw_birth)
+        if birth_date is None:
+            m = _date_search(raw_birth)
+            if m:
+                birth_date = m.group(1)
 
     # 2) 성별 우선: 인포박스 '성별' 항목
-    gender = _infobox_value_by_header(soup, ["성별"])
+    gender = _infobox_value_by_header(rows, ["성별"])
     if gender:
         gender = clean_text(gender)
     else:
         # 3) 보조: 카테고리(남자 배우 / 여자 배우 포함 여부)
-        cats = [clean_text(a.get_text()) for a in soup.select("#catlinks a")]
+        cats = [clean_text(get_text(a)) for a in CATLINKS_XPATH(doc)]
         # 좀 더 보수적으로: '남자' & '배우' / '여자' & '배우'
         if any(("남자" in c and "배우" in c) for c in cats):
             gender = "남성"
@@ -385,21 +526,17 @@ def extract_birth_date_and_gender(session: requests.Session, url: str) -> Tuple[
 
     return birth_date, gender
 
-# ================= 상세 페이지 → 배우 인물 정보 스크랩 =================
-def scrape_detail_for_people(session: requests.Session, it: Dict) -> List[Dict[str, str]]:
+# ================= 상세 페이지 → 배우 (이름, URL) 수집 =================
+def collect_actor_pairs(session: requests.Session, it: Dict) -> List[Tuple[str, str]]:
+    """작품 상세 페이지 → 배우 (이름, URL) 목록 (배우 문서는 여기서 받지 않음)"""
     url = it["detail_url"]; title_fallback = it["title_fallback"]
     if not url:
         return []
     try:
-        soup = get_soup(session, url)
-        # 배우 (이름, URL) 목록
+        soup = get_soup(session, url, parse_only=DETAIL_STRAINER)
         pairs, stats = extract_actor_links_scoped(soup)
         print(f"[detail] {title_fallback}  UL:{stats['ul']}  TABLE:{stats['table']}  DL:{stats['dl']}  FB:{stats['fallback']}")
-        out_rows: List[Dict[str, str]] = []
-        for name, person_url in pairs:
-            bday, gender = extract_birth_date_and_gender(session, person_url)
-            out_rows.append({"name": name, "birth_date": bday or "", "gender": gender or ""})
-        return out_rows
+        return pairs
     except Exception as e:
         print(f"[ERR] {url} -> {e}")
         return []
@@ -411,12 +548,27 @@ def main():
     items = extract_list_items(session, LIST_URL)
     print(f" - 작품 수집: {len(items)}개")
 
-    rows: List[Dict[str, str]] = []
     with ThreadPoolExecutor(max_workers=WORKERS) as ex:
-        futs = [ex.submit(scrape_detail_for_people, session, it) for it in items]
-        for fut in as_completed(futs):
-            rows.extend(fut.result())
-            time.sleep(SLEEP)
+        # 1단계: 작품 상세 페이지에서 배우 (이름, URL)만 수집
+        detail_futs = [ex.submit(collect_actor_pairs, session, it) for it in items]
+        # 2단계: 작품 페이지가 끝나는 대로 처음 보는 배우 문서를 같은 풀에 바로 추가
+        # (1단계 마지막 작품들을 기다리는 동안에도 배우 문서 요청이 계속 진행됨,
+        #  여러 작품에 나오는 배우도 문서는 한 번만 받음)
+        info_futs: Dict[str, Future] = {}
+        for fut in as_completed(detail_futs):
+            for _, u in fut.result():
+                if u not in info_futs:
+                    info_futs[u] = ex.submit(extract_birth_date_and_gender, session, u)
+        pairs_by_item = [fut.result() for fut in detail_futs]
+        print(f" - 배우 문서: {len(info_futs)}개")
+        info_by_url = {u: fut.result() for u, fut in info_futs.items()}
+
+    # 작품별 배우 목록에 URL 기준으로 인물 정보를 붙임
+    rows: List[Dict[str, str]] = []
+    for pairs in pairs_by_item:
+        for name, person_url in pairs:
+            bday, gender = info_by_url[person_url]
+            rows.append({"name": name, "birth_date": bday or "", "gender": gender or ""})
 
     if not rows:
         print("[-] 결과 없음"); return
@@ -13,7 +13,9 @@ import os, re
 from pathlib import Path
 from urllib.parse import quote, urljoin, urlparse
 import requests, pandas as pd
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from og_image import og_image_content
 
 CSV_PATH  = Path("person.csv")
 OUT_DIR   = Path("namu_person_images")
@@ -29,6 +31,13 @@ HEADERS = {
 TIMEOUT = 4
 ALLOWED_PREFIXES = ("/", "/w/", "/img/", "/i/", "/js/", "/css/", "/_nuxt/")
 
+ACTOR_SUFFIX_RE = re.compile(r"\s*\(배우\)\s*$")
+QUOTE_RE        = re.compile(r"[《》〈〉“”‘’\"'`]+")
+MULTISPACE_RE   = re.compile(r"\s+")
+SANITIZE_RE     = re.compile(r'[\\/:*?"<>|]+')
+SVG_ICO_RE      = re.compile(r"\.(svg|ico)(?:$|\?)", re.I)
+BAD_NAME_RE     = re.compile(r"(logo|favicon|sprite|icon)", re.I)
+
 def allowed(url: str) -> bool:
     p = urlparse(url)
     return any(p.path.startswith(pref) for pref in ALLOWED_PREFIXES)
@@ -42,47 +51,53 @@ def nurl(src: str, base: str = BASE) -> str:
     return urljoin(base, s)
 
 def sanitize(name: str) -> str:
-    return re.sub(r'[\\/:*?"<>|]+', "_", str(name)).strip() or "untitled"
+    return SANITIZE_RE.sub("_", str(name)).strip() or "untitled"
 
 def norm_name(s: str) -> str:
     if not s: return ""
     t = str(s).strip()
     # 뒤에 이미 (배우)가 붙어 있으면 정리
-    t = re.sub(r"\s*\(배우\)\s*$", "", t)
-    t = re.sub(r"[《》〈〉“”‘’\"'`]+", "", t)
-    t = re.sub(r"\s+", " ", t).strip(" .")
+    t = ACTOR_SUFFIX_RE.sub("", t)
+    t = QUOTE_RE.sub("", t)
+    t = MULTISPACE_RE.sub(" ", t).strip(" .")
     return t
 
-def get_html(url: str):
+def make_session() -> requests.Session:
+    # 문서(namu.wiki)와 이미지(CDN) 요청 모두 keep-alive 커넥션 재사용 (풀은 호스트별로 따로 관리됨)
+    s = requests.Session()
+    s.headers.update(HEADERS)
+    retry = Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504], raise_on_status=False)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=4)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+    return s
+
+def get_html(session: requests.Session, url: str):
     if not allowed(url): return None, "disallowed_path"
     try:
-        r = requests.get(url, headers=HEADERS, timeout=TIMEOUT)
+        r = session.get(url, headers=HEADERS, timeout=TIMEOUT)
         if r.status_code != 200: return None, f"http_{r.status_code}"
         return r.text, ""
     except requests.RequestException as e:
         return None, type(e).__name__
 
 def extract_og_image(html: str) -> str | None:
-    soup = BeautifulSoup(html, "html.parser")
-    tag = soup.find("meta", attrs={"property": "og:image"})
-    if not tag: return None
-    val = (tag.get("content") or "").strip()
+    val = (og_image_content(html) or "").strip()
     if not val or val.startswith("data:"): return None
-    if re.search(r"\.(svg|ico)(?:$|\?)", val, re.I): return None
-    if re.search(r"(logo|favicon|sprite|icon)", val, re.I): return None
+    if SVG_ICO_RE.search(val): return None
+    if BAD_NAME_RE.search(val): return None
     return nurl(val)
 
-def open_w_exact(title_text: str):
+def open_w_exact(session: requests.Session, title_text: str):
     url = f"{BASE}/w/{quote(title_text, safe='')}"
-    html, err = get_html(url)
+    html, err = get_html(session, url)
     if html is None: return None, url, f"open_failed:{err}"
     return html, url, "OK"
 
-def download_image(url: str, out_path: Path, referer: str) -> bool:
+def download_image(session: requests.Session, url: str, out_path: Path, referer: str) -> bool:
     if not allowed(url): return False
     headers = dict(HEADERS); headers["Referer"] = referer
     try:
-        with requests.get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
+        with session.get(url, headers=headers, stream=True, timeout=TIMEOUT) as r:
             if r.status_code != 200: return False
             out_path.parent.mkdir(parents=True, exist_ok=True)
             with open(out_path, "wb") as f:
@@ -92,11 +107,11 @@ def download_image(url: str, out_path: Path, referer: str) -> bool:
     except requests.RequestException:
         return False
 
-def find_and_download(name_display: str):
+def find_and_download(session: requests.Session, name_display: str):
     """배우용: (배우) → (배우)무공백 → 기본 순서로 og:image 찾고 다운로드."""
     base = norm_name(name_display)
     for cand in (f"{base} (배우)", f"{base}(배우)", base):
-        html, page_url, _ = open_w_exact(cand)
+        html, page_url, _ = open_w_exact(session, cand)
         if html is None: 
             continue
         img_url = extract_og_image(html)
@@ -104,7 +119,7 @@ def find_and_download(name_display: str):
             continue
         ext = os.path.splitext(img_url.split("?")[0].split("#")[0])[-1] or ".jpg"
         outp = OUT_DIR / f"{sanitize(name_display)}{ext}"
-        if download_image(img_url, outp, referer=page_url):
+        if download_image(session, img_url, outp, referer=page_url):
             return img_url
     return None  # 실패 시 None
 
@@ -125,10 +140,11 @@ def main():
     # 이름 목록 정리
     names = [str(x).strip() for x in df[name_col].fillna("") if str(x).strip()]
 
+    session = make_session()
     out_rows = []
     for i, n in enumerate(names, 1):
         print(f"[{i}/{len(names)}] {n} ...", end="")
-        img_url = find_and_download(n)
+        img_url = find_and_download(session, n)
         if img_url:
             print(" OK")
             url_value = img_url
@@ -17,15 +17,19 @@
 """
 
 import argparse
+import csv
 import os
-import time
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import requests
+from tmdb_session import make_session, SEARCH_ERROR
 
 TMDB_SEARCH_TV_URL = "https://api.themoviedb.org/3/search/tv"
 TMDB_TV_CREDITS_URL = "https://api.themoviedb.org/3/tv/{tv_id}/credits"
+WORKERS = 8  # 동시에 처리할 드라마 수 (요청 대기 시간을 겹침)
+OUT_COLS = ["drama_title", "person_name", "role_type", "character_name", "order_no"]
 
 
 def read_csv_smart(path: str) -> pd.DataFrame:
@@ -45,17 +49,8 @@ def detect_title_column(df: pd.DataFrame) -> str:
     raise SystemExit(f"제목 컬럼을 찾을 수 없습니다. (지원 후보: {candidates})")
 
 
-def clean_for_search(title: str) -> str:
-    """TMDB 검색용으로 약간 정리: (드라마) 제거 + 양쪽 공백 제거"""
-    if not isinstance(title, str):
-        title = str(title)
-    t = title.strip()
-    t = t.replace("(드라마)", "").strip()
-    return t
-
-
-def search_tmdb_tv(api_key: str, title: str) -> Optional[int]:
-    """제목으로 TMDB TV 검색 → tv_id 반환 (없으면 None)"""
+def search_tmdb_tv(session: requests.Session, api_key: str, title: str) -> Optional[int]:
+    """제목으로 TMDB TV 검색 → tv_id 반환 (없으면 None, 요청 실패면 SEARCH_ERROR)"""
     params = {
         "api_key": api_key,
         "query": title,
@@ -63,12 +58,12 @@ def search_tmdb_tv(api_key: str, title: str) -> Optional[int]:
         "include_adult": "false",
     }
     try:
-        res = requests.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
+        res = session.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
         res.raise_for_status()
         data = res.json()
     except Exception as e:
         print(f"[에러] TMDB 검색 실패: {title} -> {e}")
-        return None
+        return SEARCH_ERROR
 
     results = data.get("results") or []
     if not results:
@@ -78,25 +73,41 @@ def search_tmdb_tv(api_key: str, title: str) -> Optional[int]:
     return best.get("id")
 
 
-def fetch_tv_credits(api_key: str, tv_id: int) -> List[Dict]:
-    """TV id로 출연진 목록 가져오기 (cast 리스트)"""
+def fetch_tv_credits(session: requests.Session, api_key: str, tv_id: int) -> List[Dict]:
+    """TV id로 출연진 목록 가져오기 (cast 리스트, 요청 실패면 SEARCH_ERROR)"""
     url = TMDB_TV_CREDITS_URL.format(tv_id=tv_id)
     params = {
         "api_key": api_key,
         "language": "ko-KR",  # 가능하면 한글 캐릭터명/배우명
     }
     try:
-        res = requests.get(url, params=params, timeout=5)
+        res = session.get(url, params=params, timeout=5)
         res.raise_for_status()
         data = res.json()
     except Exception as e:
         print(f"[에러] credits 요청 실패: tv_id={tv_id} -> {e}")
-        return []
+        return SEARCH_ERROR
 
     cast = data.get("cast") or []
     return cast
 
 
+def lookup_cast(session: requests.Session, api_key: str, search_title: str) -> Tuple[Optional[int], List[Dict]]:
+    """드라마 1편 처리: 검색 → 출연진 조회 → (tv_id, cast 리스트) (작업 스레드에서 실행)
+    검색/조회 요청이 실패하면 해당 자리에 SEARCH_ERROR ('결과 없음'과 구분)"""
+    tv_id = search_tmdb_tv(session, api_key, search_title)
+    if tv_id is None or tv_id is SEARCH_ERROR:
+        return tv_id, []
+    cast_list = fetch_tv_credits(session, api_key, tv_id)
+    return tv_id, cast_list
+
+
+def load_done_keys(path: str, key_col: str) -> set:
+    """이전 실행이 남긴 출력 CSV에서 이미 처리된 키 집합 (--resume용)"""
+    done = pd.read_csv(path, encoding="utf-8-sig", usecols=[key_col], dtype=str, keep_default_na=False)
+    return set(done[key_col])
+
+
 def main():
     parser = argparse.ArgumentParser(description="TMDB 드라마 출연진 배치 수집")
     parser.add_argument("--in", dest="in_csv", default="drama.csv",
@@ -105,8 +116,14 @@ def main():
                         help="출력 CSV 경로 (기본: drama_cast_tmdb.csv)")
     parser.add_argument("--api-key", dest="api_key",
                         help="TMDB API 키 (없으면 TMDB_API_KEY 환경변수 사용)")
-    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.25,
-                        help="각 TV 처리 후 대기 시간(초) 기본 0.25")
+    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.0,
+                        help="TMDB 요청 후 고정 대기 시간(초, 스레드별, 캐시 응답은 대기 없음) 기본 0 (전체 초당 요청 수 제한은 항상 적용)")
+    parser.add_argument("--workers", dest="workers", type=int, default=WORKERS,
+                        help=f"동시 처리 스레드 수 (기본: {WORKERS})")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="응답 캐시를 쓰지 않고 모두 새로 요청")
+    parser.add_argument("--resume", action="store_true",
+                        help="기존 출력 CSV에 이어서 기록 (출연진이 이미 저장된 드라마는 건너뜀)")
     args = parser.parse_args()
 
     api_key = args.api_key or os.getenv("TMDB_API_KEY")
@@ -121,56 +138,87 @@ def main():
     title_col = detect_title_column(df)
     print(f"[정보] 제목 컬럼: {title_col}")
 
-    rows = []
-    total = len(df)
-
-    for idx, raw_title in enumerate(df[title_col], start=1):
-        drama_title = str(raw_title).strip()
-        if not drama_title or drama_title.lower() == "nan":
-            continue
-
-        search_title = clean_for_search(drama_title)
-        print(f"\n[{idx}/{total}] '{drama_title}' (검색용: '{search_title}') ... ", end="")
+    # 중단 후 --resume으로 다시 돌리면 출연진이 이미 저장된 드라마는 API를 다시 부르지 않음
+    # (검색 결과/출연진이 없던 드라마와 요청이 실패한 드라마는 행이 없으므로 다시 시도됨)
+    resume = args.resume and os.path.exists(args.out_csv) and os.path.getsize(args.out_csv) > 0
+    done = load_done_keys(args.out_csv, "drama_title") if resume else set()
 
-        tv_id = search_tmdb_tv(api_key, search_title)
-        if tv_id is None:
-            print("TMDB 검색 결과 없음")
-            continue
+    total = len(df)
 
-        print(f"tv_id={tv_id} → 출연진 조회 중...")
-        cast_list = fetch_tv_credits(api_key, tv_id)
+    # 제목 정리는 열 단위(.str)로 한 번에: 원본 제목은 앞뒤 공백만, 검색용 제목은 "(드라마)"까지 제거
+    col = df[title_col].fillna("").astype(str).str.strip()
+    search_col = col.str.replace("(드라마)", "", regex=False).str.strip()
 
-        if not cast_list:
-            print("  → cast 없음 또는 요청 실패")
+    titles = []  # (행 번호, 드라마 제목, 검색용 제목)
+    for idx, (drama_title, search_title) in enumerate(zip(col, search_col), start=1):
+        if not drama_title or drama_title.lower() == "nan" or drama_title in done:
             continue
-
-        added = 0
-        for c in cast_list:
-            person_name = c.get("name") or ""
-            character_name = c.get("character") or ""
-
-            # 요청사항대로 role_type, order_no 고정
-            rows.append({
-                "drama_title": drama_title,    # 원본 제목 그대로
-                "person_name": person_name,
-                "role_type": "actor",
-                "character_name": character_name,
-                "order_no": 1,
-            })
-            added += 1
-
-        print(f"  → {added}명 추가")
-        time.sleep(args.sleep_sec)
-
-    if not rows:
-        print("\n[경고] 어떤 출연진도 수집되지 않았습니다.")
+        titles.append((idx, drama_title, search_title))
+    if resume:
+        print(f"[정보] 이어서 실행: 이미 저장된 드라마 {len(done)}편 건너뜀")
+
+    # 드라마별 TMDB 요청은 서로 독립 → 스레드로 네트워크 대기를 겹침 (결과는 입력 순서대로 받음)
+    # 드라마 1편의 출연진은 바로 CSV에 쓰고 flush → 중간에 끊겨도 그때까지의 결과는 남음
+    written = 0
+    failed = 0
+    interrupted = False
+    session = make_session(args.workers, use_cache=not args.no_cache, sleep_sec=args.sleep_sec)
+    with open(args.out_csv, "a" if resume else "w", newline="", encoding="utf-8-sig") as f, \
+            session, ThreadPoolExecutor(max_workers=args.workers) as ex:
+        w = csv.DictWriter(f, fieldnames=OUT_COLS)
+        if not resume:
+            w.writeheader()
+        results = ex.map(lambda t: lookup_cast(session, api_key, t[2]), titles)
+        try:
+            for (idx, drama_title, search_title), (tv_id, cast_list) in zip(titles, results):
+                print(f"\n[{idx}/{total}] '{drama_title}' (검색용: '{search_title}') ... ", end="")
+
+                if tv_id is SEARCH_ERROR:
+                    print("검색 요청 실패 (저장 안 함, --resume으로 다시 조회)")
+                    failed += 1
+                    continue
+                if tv_id is None:
+                    print("TMDB 검색 결과 없음")
+                    continue
+
+                print(f"tv_id={tv_id} → 출연진 조회")
+
+                if cast_list is SEARCH_ERROR:
+                    print("  → 출연진 요청 실패 (저장 안 함, --resume으로 다시 조회)")
+                    failed += 1
+                    continue
+                if not cast_list:
+                    print("  → cast 없음")
+                    continue
+
+                # 요청사항대로 role_type, order_no 고정
+                rows = [{
+                    "drama_title": drama_title,    # 원본 제목 그대로
+                    "person_name": c.get("name") or "",
+                    "role_type": "actor",
+                    "character_name": c.get("character") or "",
+                    "order_no": 1,
+                } for c in cast_list]
+                # 한 편의 출연진은 모두 모은 뒤 한 번에 기록 → 일부만 저장된 드라마가 --resume에서 '완료'로 보이지 않게
+                w.writerows(rows)
+                f.flush()
+                written += len(rows)
+                print(f"  → {len(rows)}명 추가")
+        except KeyboardInterrupt:
+            # Ctrl-C: 대기 중인 작업은 취소하고, 이미 보낸 요청만 끝나면 with 블록을 빠져나감
+            ex.shutdown(wait=False, cancel_futures=True)
+            interrupted = True
+
+    if interrupted:
+        print(f"\n[중단] Ctrl-C: 남은 작업은 취소했습니다. 여기까지 {args.out_csv}에 저장됐고, --resume으로 다시 실행하면 이어서 조회합니다.")
+        raise SystemExit(130)
+
+    if not written:
+        print("\n[경고] 이번 실행에서 수집된 출연진이 없습니다.")
     else:
-        out_df = pd.DataFrame(
-            rows,
-            columns=["drama_title", "person_name", "role_type", "character_name", "order_no"]
-        )
-        out_df.to_csv(args.out_csv, index=False, encoding="utf-8-sig")
-        print(f"\n[완료] 저장: {args.out_csv} (총 {len(out_df)}행)")
+        print(f"\n[완료] 저장: {args.out_csv} (이번 실행 {written}행)")
+    if failed:
+        print(f"[경고] 요청 실패 {failed}편은 저장하지 않았습니다. --resume으로 다시 실행하면 이것만 다시 조회합니다.")
 
 
 if __name__ == "__main__":
@@ -6,13 +6,15 @@ Genre_Image.csv의 title에서 (드라마) 제거 → TMDB 검색 → TMDB 포
 
 import argparse
 import os
-import time
 import pandas as pd
 import requests
+from tmdb_session import make_session, SEARCH_ERROR
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 TMDB_SEARCH_TV_URL = "https://api.themoviedb.org/3/search/tv"
 TMDB_IMG_BASE = "https://image.tmdb.org/t/p"  # /w500 + path
+WORKERS = 8  # 동시에 검색할 제목 수
 
 
 def read_csv_smart(path: str) -> pd.DataFrame:
@@ -22,15 +24,7 @@ def read_csv_smart(path: str) -> pd.DataFrame:
         return pd.read_csv(path, encoding="cp949")
 
 
-def clean_title(title: str) -> str:
-    if not isinstance(title, str):
-        title = str(title)
-    t = title.strip()
-    t = t.replace("(드라마)", "").strip()
-    return t
-
-
-def search_tmdb_tv(api_key: str, title: str) -> Optional[dict]:
+def search_tmdb_tv(session: requests.Session, api_key: str, title: str) -> Optional[dict]:
     params = {
         "api_key": api_key,
         "query": title,
@@ -38,11 +32,12 @@ def search_tmdb_tv(api_key: str, title: str) -> Optional[dict]:
         "include_adult": "false",
     }
     try:
-        res = requests.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
+        res = session.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
         res.raise_for_status()
         data = res.json()
-    except Exception:
-        return None
+    except Exception as e:
+        print(f"[에러] TMDB 요청 실패: {title} -> {e}")
+        return SEARCH_ERROR
 
     results = data.get("results") or []
     if not results:
@@ -56,12 +51,22 @@ def build_img_url(path: Optional[str], size: str = "w500") -> Optional[str]:
     return f"{TMDB_IMG_BASE}/{size}{path}"
 
 
+def load_done_count(path: str) -> int:
+    """이전 실행이 남긴 출력 CSV의 데이터 행 수 (--resume용, 행은 입력 순서대로 기록됨)"""
+    return len(pd.read_csv(path, encoding="utf-8-sig", usecols=[0], dtype=str))
+
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--in", dest="in_csv", default="Genre_Image.csv")
     parser.add_argument("--out", dest="out_csv", default="Genre_Image_tmdb.csv")
     parser.add_argument("--api-key", dest="api_key")
-    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.25)
+    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.0)
+    parser.add_argument("--workers", dest="workers", type=int, default=WORKERS)
+    parser.add_argument("--no-cache", action="store_true",
+                        help="응답 캐시를 쓰지 않고 모두 새로 요청")
+    parser.add_argument("--resume", action="store_true",
+                        help="기존 출력 CSV에 이어서 기록 (이미 저장된 앞쪽 행은 건너뜀)")
     args = parser.parse_args()
 
     api_key = args.api_key or os.getenv("TMDB_API_KEY")
@@ -74,30 +79,65 @@ def main():
         raise SystemExit("입력 CSV에 'title' 컬럼이 없습니다.")
 
     # title 정제 (드라마 제거)
-    df["title"] = df["title"].astype(str).apply(clean_title)
-
-    urls = []
-
-    for idx, row in df.iterrows():
-        title = row["title"]
-        print(f"[{idx+1}/{len(df)}] TMDB 검색: {title} ...", end=" ")
-
-        best = search_tmdb_tv(api_key, title)
-        if best:
-            poster_url = build_img_url(best.get("poster_path"))
-            print(f"OK (poster={bool(poster_url)})")
-        else:
-            poster_url = None
-            print("결과 없음")
-
-        urls.append(poster_url)
-        time.sleep(args.sleep_sec)
-
-    # 기존 url 컬럼 삭제 후 새 url 컬럼 생성
-    df["url"] = urls
-
-    df.to_csv(args.out_csv, index=False, encoding="utf-8-sig")
-    print(f"[완료] TMDB 포스터 URL로 갱신 완료: {args.out_csv}")
+    # 행마다 파이썬 함수를 부르지 않고 열 단위(.str)로 한 번에 처리 (빈 제목은 검색하지 않음)
+    df["title"] = df["title"].fillna("").astype(str).str.replace("(드라마)", "", regex=False).str.strip()
+
+    # 기존 url은 무시하고 새 url로 덮어씀 (컬럼이 없으면 맨 뒤에 추가)
+    df["url"] = None
+
+    # 같은 제목이 여러 장르 행에 나올 수 있으므로 제목이 아니라 행 위치로 이어 씀
+    # (출력은 입력 행 순서대로 기록되므로 기존 출력의 행 수 = 처리 끝난 앞쪽 행 수)
+    resume = args.resume and os.path.exists(args.out_csv) and os.path.getsize(args.out_csv) > 0
+    done = load_done_count(args.out_csv) if resume else 0
+    todo = df.iloc[done:]
+    if resume:
+        print(f"[정보] 이어서 실행: 이미 저장된 {done}행 건너뜀")
+
+    # 제목별 검색은 서로 독립 → 스레드로 동시에 요청 (결과는 행 순서대로 받음)
+    # 결과는 한 행씩 바로 CSV에 쓰고 flush → 중간에 끊겨도 그때까지의 결과는 남음
+    stopped = False
+    interrupted = False
+    session = make_session(args.workers, use_cache=not args.no_cache, sleep_sec=args.sleep_sec)
+    with open(args.out_csv, "a" if resume else "w", newline="", encoding="utf-8-sig") as f, \
+            session, ThreadPoolExecutor(max_workers=args.workers) as ex:
+        if not resume:
+            df.iloc[:0].to_csv(f, index=False)  # 헤더만
+        results = ex.map(lambda t: search_tmdb_tv(session, api_key, t) if t else None, todo["title"])
+        try:
+            for (idx, row), best in zip(todo.iterrows(), results):
+                title = row["title"]
+                print(f"[{idx+1}/{len(df)}] TMDB 검색: {title} ...", end=" ")
+
+                # 행 위치로 이어 쓰므로 실패한 행부터는 쓰지 않고 중단 (--resume 시 이 행부터 다시 조회)
+                if best is SEARCH_ERROR:
+                    print("요청 실패 → 중단")
+                    ex.shutdown(wait=False, cancel_futures=True)
+                    stopped = True
+                    break
+
+                if best:
+                    poster_url = build_img_url(best.get("poster_path"))
+                    print(f"OK (poster={bool(poster_url)})")
+                else:
+                    poster_url = None
+                    print("결과 없음")
+
+                df.at[idx, "url"] = poster_url
+                df.loc[[idx]].to_csv(f, header=False, index=False)
+                f.flush()
+        except KeyboardInterrupt:
+            # Ctrl-C: 대기 중인 작업은 취소하고, 이미 보낸 요청만 끝나면 with 블록을 빠져나감
+            ex.shutdown(wait=False, cancel_futures=True)
+            interrupted = True
+
+    if interrupted:
+        print(f"\n[중단] Ctrl-C: 남은 작업은 취소했습니다. 여기까지 {args.out_csv}에 저장됐고, --resume으로 다시 실행하면 이어서 조회합니다.")
+        raise SystemExit(130)
+
+    if stopped:
+        print(f"[경고] 요청 실패로 {args.out_csv}에 {idx}행까지만 저장했습니다. --resume으로 다시 실행하면 실패한 행부터 이어서 조회합니다.")
+    else:
+        print(f"[완료] TMDB 포스터 URL로 갱신 완료: {args.out_csv}")
 
 
 if __name__ == "__main__":
@@ -22,16 +22,20 @@ Windows PowerShell 기준:
 """
 
 import argparse
+import csv
 import os
 import sys
-import time
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import requests
+from tmdb_session import make_session, SEARCH_ERROR
 
 TMDB_SEARCH_TV_URL = "https://api.themoviedb.org/3/search/tv"
 TMDB_IMG_BASE = "https://image.tmdb.org/t/p"  # 뒤에 /w500, /original + path 붙임
+WORKERS = 8  # 동시에 검색할 제목 수 (요청 대기 시간을 겹침)
+OUT_COLS = ["drama_title", "tmdb_id", "poster_url", "backdrop_url", "source"]
 
 
 def detect_title_column(df: pd.DataFrame) -> str:
@@ -43,8 +47,8 @@ def detect_title_column(df: pd.DataFrame) -> str:
     raise SystemExit(f"제목 컬럼을 찾을 수 없습니다. (지원: {candidates})")
 
 
-def search_tmdb_tv(api_key: str, title: str) -> Optional[dict]:
-    """TMDB TV 검색 API 호출 -> 최상단 결과 반환 (없으면 None)"""
+def search_tmdb_tv(session: requests.Session, api_key: str, title: str) -> Optional[dict]:
+    """TMDB TV 검색 API 호출 -> 최상단 결과 반환 (없으면 None, 요청 실패면 SEARCH_ERROR)"""
     params = {
         "api_key": api_key,
         "query": title,
@@ -52,12 +56,12 @@ def search_tmdb_tv(api_key: str, title: str) -> Optional[dict]:
         "include_adult": "false",
     }
     try:
-        res = requests.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
+        res = session.get(TMDB_SEARCH_TV_URL, params=params, timeout=5)
         res.raise_for_status()
         data = res.json()
     except Exception as e:
         print(f"[에러] TMDB 요청 실패: {title} -> {e}")
-        return None
+        return SEARCH_ERROR
 
     results = data.get("results") or []
     if not results:
@@ -75,13 +79,25 @@ def build_img_url(path: Optional[str], size: str = "w500") -> Optional[str]:
     return f"{TMDB_IMG_BASE}/{size}{path}"
 
 
+def load_done_keys(path: str, key_col: str) -> set:
+    """이전 실행이 남긴 출력 CSV에서 이미 처리된 키 집합 (--resume용)"""
+    done = pd.read_csv(path, encoding="utf-8-sig", usecols=[key_col], dtype=str, keep_default_na=False)
+    return set(done[key_col])
+
+
 def main():
     parser = argparse.ArgumentParser(description="TMDB 드라마 이미지 배치 수집(방식 A)")
     parser.add_argument("--in", dest="in_csv", required=True, help="입력 CSV 경로 (드라마 제목 목록)")
     parser.add_argument("--out", dest="out_csv", default="drama_tmdb_image.csv", help="출력 CSV 경로")
     parser.add_argument("--api-key", dest="api_key", help="TMDB API 키 (없으면 TMDB_API_KEY 환경변수 사용)")
-    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.25,
-                        help="API 호출 사이 딜레이(초) 기본=0.25")
+    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.0,
+                        help="API 호출 사이 고정 딜레이(초, 스레드별, 캐시 응답은 대기 없음) 기본=0 (전체 초당 요청 수 제한은 항상 적용)")
+    parser.add_argument("--workers", dest="workers", type=int, default=WORKERS,
+                        help=f"동시 요청 스레드 수 기본={WORKERS}")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="응답 캐시를 쓰지 않고 모두 새로 요청")
+    parser.add_argument("--resume", action="store_true",
+                        help="기존 출력 CSV에 이어서 기록 (이미 저장된 제목은 건너뜀)")
     args = parser.parse_args()
 
     api_key = args.api_key or os.getenv("TMDB_API_KEY")
@@ -101,50 +117,82 @@ def main():
     title_col = detect_title_column(df)
     print(f"[정보] 제목 컬럼: {title_col}")
 
-    rows = []
+    # 중단 후 --resume으로 다시 돌리면 이미 저장된 제목은 API를 다시 부르지 않음
+    resume = args.resume and os.path.exists(args.out_csv) and os.path.getsize(args.out_csv) > 0
+    done = load_done_keys(args.out_csv, "drama_title") if resume else set()
+
     total = len(df)
 
-    for idx, val in enumerate(df[title_col], start=1):
-        title = str(val).strip()
-        if not title or title.lower() == "nan":
+    titles = []  # (행 번호, 제목)
+    col = df[title_col].fillna("").astype(str).str.strip()  # 행마다 str()/strip() 대신 열 단위로 정리
+    for idx, title in enumerate(col, start=1):
+        if not title or title.lower() == "nan" or title in done:
             continue
-
-        print(f"[{idx}/{total}] TMDB 검색 중: {title!r} ...", end=" ")
-
-        best = search_tmdb_tv(api_key, title)
-        if best is None:
-            print("결과 없음")
-            rows.append({
-                "drama_title": title,
-                "tmdb_id": None,
-                "poster_url": None,
-                "backdrop_url": None,
-                "source": "none",
-            })
-        else:
-            tmdb_id = best.get("id")
-            poster_path = best.get("poster_path")
-            backdrop_path = best.get("backdrop_path")
-
-            poster_url = build_img_url(poster_path, size="w500")
-            backdrop_url = build_img_url(backdrop_path, size="w780")
-
-            print(f"OK (id={tmdb_id}, poster={bool(poster_url)}, backdrop={bool(backdrop_url)})")
-
-            rows.append({
-                "drama_title": title,
-                "tmdb_id": tmdb_id,
-                "poster_url": poster_url,
-                "backdrop_url": backdrop_url,
-                "source": "tmdb",
-            })
-
-        time.sleep(args.sleep_sec)
-
-    out_df = pd.DataFrame(rows,
-                          columns=["drama_title", "tmdb_id", "poster_url", "backdrop_url", "source"])
-    out_df.to_csv(args.out_csv, index=False, encoding="utf-8-sig")
-    print(f"[완료] 저장: {args.out_csv} (총 {len(out_df)}행)")
+        titles.append((idx, title))
+    if resume:
+        print(f"[정보] 이어서 실행: 이미 저장된 {len(done)}개 제목 건너뜀")
+
+    # 제목별 검색은 서로 독립 → 스레드로 동시에 요청 (결과는 입력 순서대로 받음)
+    # 결과는 한 행씩 바로 CSV에 쓰고 flush → 중간에 끊겨도 그때까지의 결과는 남음
+    written = failed = 0
+    interrupted = False
+    session = make_session(args.workers, use_cache=not args.no_cache, sleep_sec=args.sleep_sec)
+    with open(args.out_csv, "a" if resume else "w", newline="", encoding="utf-8-sig") as f, \
+            session, ThreadPoolExecutor(max_workers=args.workers) as ex:
+        w = csv.DictWriter(f, fieldnames=OUT_COLS)
+        if not resume:
+            w.writeheader()
+        results = ex.map(lambda t: search_tmdb_tv(session, api_key, t[1]), titles)
+        try:
+            for (idx, title), best in zip(titles, results):
+                print(f"[{idx}/{total}] TMDB 검색 중: {title!r} ...", end=" ")
+
+                if best is SEARCH_ERROR:
+                    print("요청 실패 (저장 안 함, --resume으로 다시 조회)")
+                    failed += 1
+                    continue
+                if best is None:
+                    print("결과 없음")
+                    row = {
+                        "drama_title": title,
+                        "tmdb_id": None,
+                        "poster_url": None,
+                        "backdrop_url": None,
+                        "source": "none",
+                    }
+                else:
+                    tmdb_id = best.get("id")
+                    poster_path = best.get("poster_path")
+                    backdrop_path = best.get("backdrop_path")
+
+                    poster_url = build_img_url(poster_path, size="w500")
+                    backdrop_url = build_img_url(backdrop_path, size="w780")
+
+                    print(f"OK (id={tmdb_id}, poster={bool(poster_url)}, backdrop={bool(backdrop_url)})")
+
+                    row = {
+                        "drama_title": title,
+                        "tmdb_id": tmdb_id,
+                        "poster_url": poster_url,
+                        "backdrop_url": backdrop_url,
+                        "source": "tmdb",
+                    }
+
+                w.writerow(row)
+                f.flush()
+                written += 1
+        except KeyboardInterrupt:
+            # Ctrl-C: 대기 중인 작업은 취소하고, 이미 보낸 요청만 끝나면 with 블록을 빠져나감
+            ex.shutdown(wait=False, cancel_futures=True)
+            interrupted = True
+
+    if interrupted:
+        print(f"\n[중단] Ctrl-C: 남은 작업은 취소했습니다. 여기까지 {args.out_csv}에 저장됐고, --resume으로 다시 실행하면 이어서 조회합니다.")
+        raise SystemExit(130)
+
+    print(f"[완료] 저장: {args.out_csv} (이번 실행 {written}행, 총 {written + len(done)}행)")
+    if failed:
+        print(f"[경고] 요청 실패 {failed}개 제목은 저장하지 않았습니다. --resume으로 다시 실행하면 이것만 다시 조회합니다.")
 
 
 if __name__ == "__main__":
@@ -14,15 +14,19 @@ TMDB Person 검색으로 배우 프로필 이미지 URL 수집 스크립트
 """
 
 import argparse
+import csv
 import os
-import time
 from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
 
 import pandas as pd
 import requests
+from tmdb_session import make_session, SEARCH_ERROR
 
 TMDB_SEARCH_PERSON_URL = "https://api.themoviedb.org/3/search/person"
 TMDB_IMG_BASE = "https://image.tmdb.org/t/p"  # /w500 + path
+WORKERS = 8  # 동시에 검색할 배우 수 (요청 대기 시간을 겹침)
+OUT_COLS = ["name", "tmdb_person_id", "profile_url", "source"]
 
 
 def detect_name_column(df: pd.DataFrame) -> str:
@@ -34,8 +38,8 @@ def detect_name_column(df: pd.DataFrame) -> str:
     raise SystemExit(f"이름 컬럼을 찾을 수 없습니다. (지원: {candidates})")
 
 
-def search_person(api_key: str, name: str) -> Optional[dict]:
-    """TMDB Person 검색 → 가장 적절한 결과 하나 반환"""
+def search_person(session: requests.Session, api_key: str, name: str) -> Optional[dict]:
+    """TMDB Person 검색 → 가장 적절한 결과 하나 반환 (없으면 None, 요청 실패면 SEARCH_ERROR)"""
     params = {
         "api_key": api_key,
         "query": name,
@@ -43,12 +47,12 @@ def search_person(api_key: str, name: str) -> Optional[dict]:
         "include_adult": "false",
     }
     try:
-        res = requests.get(TMDB_SEARCH_PERSON_URL, params=params, timeout=5)
+        res = session.get(TMDB_SEARCH_PERSON_URL, params=params, timeout=5)
         res.raise_for_status()
         data = res.json()
     except Exception as e:
         print(f"[에러] TMDB 요청 실패: {name} -> {e}")
-        return None
+        return SEARCH_ERROR
 
     results = data.get("results") or []
     if not results:
@@ -67,6 +71,12 @@ def build_profile_url(path: Optional[str], size: str = "w500") -> Optional[str]:
     return f"{TMDB_IMG_BASE}/{size}{path}"
 
 
+def load_done_keys(path: str, key_col: str) -> set:
+    """이전 실행이 남긴 출력 CSV에서 이미 처리된 키 집합 (--resume용)"""
+    done = pd.read_csv(path, encoding="utf-8-sig", usecols=[key_col], dtype=str, keep_default_na=False)
+    return set(done[key_col])
+
+
 def main():
     parser = argparse.ArgumentParser(description="TMDB 배우 프로필 이미지 배치 수집")
     parser.add_argument("--in", dest="in_csv", default="allperson.csv",
@@ -75,8 +85,14 @@ def main():
                         help="출력 CSV 경로 (기본: person_tmdb_image.csv)")
     parser.add_argument("--api-key", dest="api_key",
                         help="TMDB API 키 (없으면 TMDB_API_KEY 환경변수 사용)")
-    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.25,
-                        help="API 호출 사이 딜레이(초) 기본=0.25")
+    parser.add_argument("--sleep", dest="sleep_sec", type=float, default=0.0,
+                        help="API 호출 사이 고정 딜레이(초, 스레드별, 캐시 응답은 대기 없음) 기본=0 (전체 초당 요청 수 제한은 항상 적용)")
+    parser.add_argument("--workers", dest="workers", type=int, default=WORKERS,
+                        help=f"동시 요청 스레드 수 기본={WORKERS}")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="응답 캐시를 쓰지 않고 모두 새로 요청")
+    parser.add_argument("--resume", action="store_true",
+                        help="기존 출력 CSV에 이어서 기록 (이미 저장된 이름은 건너뜀)")
     args = parser.parse_args()
 
     api_key = args.api_key or os.getenv("TMDB_API_KEY")
@@ -96,44 +112,77 @@ def main():
     name_col = detect_name_column(df)
     print(f"[정보] 이름 컬럼: {name_col}")
 
-    rows = []
+    # 중단 후 --resume으로 다시 돌리면 이미 저장된 이름은 API를 다시 부르지 않음
+    resume = args.resume and os.path.exists(args.out_csv) and os.path.getsize(args.out_csv) > 0
+    done = load_done_keys(args.out_csv, "name") if resume else set()
+
     total = len(df)
 
-    for idx, val in enumerate(df[name_col], start=1):
-        name = str(val).strip()
-        if not name or name.lower() == "nan":
+    names = []  # (행 번호, 이름)
+    col = df[name_col].fillna("").astype(str).str.strip()  # 행마다 str()/strip() 대신 열 단위로 정리
+    for idx, name in enumerate(col, start=1):
+        if not name or name.lower() == "nan" or name in done:
             continue
-
-        print(f"[{idx}/{total}] TMDB 배우 검색: {name!r} ...", end=" ")
-
-        best = search_person(api_key, name)
-        if best is None:
-            print("결과 없음")
-            rows.append({
-                "name": name,
-                "tmdb_person_id": None,
-                "profile_url": None,
-                "source": "none",
-            })
-        else:
-            tmdb_person_id = best.get("id")
-            profile_path = best.get("profile_path")
-            profile_url = build_profile_url(profile_path, size="w500")
-
-            print(f"OK (id={tmdb_person_id}, profile={bool(profile_url)})")
-
-            rows.append({
-                "name": name,
-                "tmdb_person_id": tmdb_person_id,
-                "profile_url": profile_url,
-                "source": "tmdb",
-            })
-
-        time.sleep(args.sleep_sec)
-
-    out_df = pd.DataFrame(rows, columns=["name", "tmdb_person_id", "profile_url", "source"])
-    out_df.to_csv(args.out_csv, index=False, encoding="utf-8-sig")
-    print(f"[완료] 저장: {args.out_csv} (총 {len(out_df)}행)")
+        names.append((idx, name))
+    if resume:
+        print(f"[정보] 이어서 실행: 이미 저장된 {len(done)}명 건너뜀")
+
+    # 배우별 검색은 서로 독립 → 스레드로 동시에 요청 (결과는 입력 순서대로 받음)
+    # 결과는 한 행씩 바로 CSV에 쓰고 flush → 중간에 끊겨도 그때까지의 결과는 남음
+    written = failed = 0
+    interrupted = False
+    session = make_session(args.workers, use_cache=not args.no_cache, sleep_sec=args.sleep_sec)
+    with open(args.out_csv, "a" if resume else "w", newline="", encoding="utf-8-sig") as f, \
+            session, ThreadPoolExecutor(max_workers=args.workers) as ex:
+        w = csv.DictWriter(f, fieldnames=OUT_COLS)
+        if not resume:
+            w.writeheader()
+        results = ex.map(lambda t: search_person(session, api_key, t[1]), names)
+        try:
+            for (idx, name), best in zip(names, results):
+                print(f"[{idx}/{total}] TMDB 배우 검색: {name!r} ...", end=" ")
+
+                if best is SEARCH_ERROR:
+                    print("요청 실패 (저장 안 함, --resume으로 다시 조회)")
+                    failed += 1
+                    continue
+                if best is None:
+                    print("결과 없음")
+                    row = {
+                        "name": name,
+                        "tmdb_person_id": None,
+                        "profile_url": None,
+                        "source": "none",
+                    }
+                else:
+                    tmdb_person_id = best.get("id")
+                    profile_path = best.get("profile_path")
+                    profile_url = build_profile_url(profile_path, size="w500")
+
+                    print(f"OK (id={tmdb_person_id}, profile={bool(profile_url)})")
+
+                    row = {
+                        "name": name,
+                        "tmdb_person_id": tmdb_person_id,
+                        "profile_url": profile_url,
+                        "source": "tmdb",
+                    }
+
+                w.writerow(row)
+                f.flush()
+                written += 1
+        except KeyboardInterrupt:
+            # Ctrl-C: 대기 중인 작업은 취소하고, 이미 보낸 요청만 끝나면 with 블록을 빠져나감
+            ex.shutdown(wait=False, cancel_futures=True)
+            interrupted = True
+
+    if interrupted:
+        print(f"\n[중단] Ctrl-C: 남은 작업은 취소했습니다. 여기까지 {args.out_csv}에 저장됐고, --resume으로 다시 실행하면 이어서 조회합니다.")
+        raise SystemExit(130)
+
+    print(f"[완료] 저장: {args.out_csv} (이번 실행 {written}행, 총 {written + len(done)}행)")
+    if failed:
+        print(f"[경고] 요청 실패 {failed}명은 저장하지 않았습니다. --resume으로 다시 실행하면 이것만 다시 조회합니다.")
 
 
 if __name__ == "__main__":
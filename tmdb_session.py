@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+"""
+TMDB API 공용 세션/상수
+(tmdb_image_batch.py / tmdb_person_image_batch.py / tmdb_drama_cast_batch.py / tmdb_genre_image_batch.py에서 같이 사용)
+"""
+
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+try:
+    from requests_cache import CachedSession
+except ImportError:  # requests-cache 미설치 시 캐시 없이 일반 세션 사용
+    CachedSession = None
+
+CACHE_NAME = "tmdb_cache"  # → tmdb_cache.sqlite (TMDB 배치 스크립트 공용)
+CACHE_TTL  = 86400  # 이 시간이 지나면 ETag/Last-Modified로 재검증 (304면 저장된 본문 사용)
+RATE_LIMIT = 20  # 모든 워커 합쳐 초당 최대 요청 수 (TMDB 상한 약 40건/초의 절반, X-RateLimit 헤더는 더 이상 오지 않음)
+SEARCH_ERROR = object()  # 요청 실패(타임아웃, 재시도 후에도 429 등) 표시 → '결과 없음'(None)과 구분해 저장하지 않음
+
+_RATE_LOCK = threading.Lock()
+_next_request_at = 0.0
+
+def wait_turn() -> None:
+    """모든 워커 합쳐 초당 RATE_LIMIT건 이하로 유지: 잠금 안에서 다음 허용 시각만 예약, 대기는 잠금 밖에서"""
+    global _next_request_at
+    with _RATE_LOCK:
+        now = time.monotonic()
+        at = max(now, _next_request_at)
+        _next_request_at = at + 1.0 / RATE_LIMIT
+    if at > now:
+        time.sleep(at - now)
+
+def make_session(pool_size: int, use_cache: bool = True, sleep_sec: float = 0.0) -> requests.Session:
+    """TMDB API용 세션: 작업 스레드들이 keep-alive 커넥션 풀을 같이 씀 (요청마다 TCP/TLS 재연결 없음)"""
+    # 재실행 시 같은 검색/조회는 로컬 SQLite 캐시에서 읽고, 만료된 항목은 If-None-Match /
+    # If-Modified-Since 조건부 요청으로 확인 → 바뀌지 않았으면 304(본문 없음) 후 캐시 본문 사용
+    # (api_key 파라미터는 requests-cache가 캐시 키/저장 내용에서 기본으로 제외)
+    if use_cache and CachedSession is not None:
+        s = CachedSession(CACHE_NAME, expire_after=CACHE_TTL, allowable_methods=("GET",))
+    else:
+        s = requests.Session()
+    # 429/503에 Retry-After 헤더가 오면 urllib3가 그 시간만큼 기다린 뒤 재시도 (없으면 지수 백오프)
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=[429, 500, 502, 503, 504],
+                  respect_retry_after_header=True)
+    adapter = HTTPAdapter(max_retries=retry, pool_connections=4, pool_maxsize=pool_size)
+    s.mount("https://", adapter); s.mount("http://", adapter)
+
+    def polite_delay(r: requests.Response, *args, **kwargs) -> None:
+        # 응답 훅: 캐시 응답은 API를 부르지 않았으므로 바로 진행
+        if getattr(r, "from_cache", False):
+            return
+        wait_turn()  # 전체 초당 요청 수 제한은 --sleep 값과 관계없이 항상 적용
+        if sleep_sec > 0:
+            time.sleep(sleep_sec)
+    s.hooks["response"].append(polite_delay)
+    return s